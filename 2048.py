@@ -1,8 +1,7 @@
 import pygame
 import random
 
-# Initialize Pygame
-pygame.init()
+import textcache
 
 # Constants
 WIDTH, HEIGHT = 400, 400
@@ -25,7 +24,7 @@ COLORS = {
 }
 
 # Font for rendering
-FONT = pygame.font.SysFont('Arial', 40)
+FONT = ('Arial', 40)
 
 # Game Class
 class Game:
@@ -47,7 +46,7 @@ class Game:
                 value = self.grid[i][j]
                 pygame.draw.rect(screen, COLORS[value], (j * CELL_SIZE, i * CELL_SIZE, CELL_SIZE, CELL_SIZE))
                 if value != 0:
-                    text = FONT.render(str(value), True, (255, 255, 255))
+                    text = textcache.render(FONT, str(value), (255, 255, 255))
                     text_rect = text.get_rect(center=(j * CELL_SIZE + CELL_SIZE // 2, i * CELL_SIZE + CELL_SIZE // 2))
                     screen.blit(text, text_rect)
 
@@ -108,6 +107,7 @@ class Game:
         self.add_tile()
 
 def main():
+    pygame.init()
     clock = pygame.time.Clock()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('2048 Game')
@@ -0,0 +1,159 @@
+import argparse
+import importlib
+import random
+import time
+
+import numpy as np
+
+from rng import GOLDEN_GAMMA, mix64
+
+# Many 2048 games stepped together. Boards are one (B, N, N) array of tile
+# exponents (0 = empty, 1 = 2, 2 = 4, ...) so a move is a handful of array
+# operations for the whole batch, for any grid size N.
+
+GRID_SIZE = 4
+DIRECTIONS = ('left', 'right', 'up', 'down')
+LEFT, RIGHT, UP, DOWN = range(4)
+EXPONENT = np.int16  # Tile exponents, wide enough for big grids
+
+
+def compress(cells):
+    # Stable sort on "is empty" pushes tiles left and keeps their order
+    order = np.argsort(cells == 0, axis=-1, kind='stable')
+    return np.take_along_axis(cells, order, axis=-1)
+
+
+def slide_left(cells):
+    """Move every row left like Game.move. Returns (cells, score per board)."""
+    cells = compress(cells)
+    score = np.zeros(len(cells), dtype=np.int64)
+    for j in range(cells.shape[-1] - 1):
+        a = cells[:, :, j]
+        b = cells[:, :, j + 1]
+        merged = (a == b) & (a != 0)
+        a[merged] += 1
+        b[merged] = 0
+        score += np.where(merged, np.left_shift(1, a.astype(np.int64)), 0).sum(axis=1)
+    return compress(cells), score
+
+
+# Views that turn each direction into a left move, and back again
+def to_left(cells, direction):
+    if direction == RIGHT:
+        return cells[:, :, ::-1]
+    if direction == UP:
+        return cells.transpose(0, 2, 1)
+    if direction == DOWN:
+        return cells.transpose(0, 2, 1)[:, :, ::-1]
+    return cells
+
+
+def from_left(cells, direction):
+    if direction == DOWN:
+        return cells[:, :, ::-1].transpose(0, 2, 1)
+    return to_left(cells, direction)
+
+
+# Batch of 2048 games
+class BatchGame:
+    def __init__(self, batch_size, grid_size=GRID_SIZE, seed=0):
+        # The largest tile possible is 2 ** (cells + 1), which has to fit the exponent type
+        if grid_size * grid_size + 1 > np.iinfo(EXPONENT).max:
+            raise ValueError(f"grid size {grid_size} is too large")
+        self.batch_size = batch_size
+        self.grid_size = grid_size
+        self.reset(seed + np.arange(batch_size, dtype=np.uint64))
+
+    def reset(self, seeds):
+        """Start fresh games. Each board gets its own random stream from its seed."""
+        self.boards = np.zeros((self.batch_size, self.grid_size, self.grid_size), dtype=EXPONENT)
+        self.scores = np.zeros(self.batch_size, dtype=np.int64)
+        self.rng_state = mix64(np.asarray(seeds, dtype=np.uint64))
+        everyone = np.ones(self.batch_size, dtype=bool)
+        self.add_tiles(everyone)
+        self.add_tiles(everyone)
+
+    def random(self):
+        """Next uint64 from every board's SplitMix64 stream."""
+        self.rng_state += GOLDEN_GAMMA
+        return mix64(self.rng_state)
+
+    def add_tiles(self, mask):
+        """Add a 2 or a 4 to a random empty cell of each masked board."""
+        draws = self.random()
+        flat = self.boards.reshape(self.batch_size, -1)
+        empty = flat == 0
+        counts = empty.sum(axis=1)
+        mask = mask & (counts > 0)
+        # Top 53 bits pick the cell, the lowest bit picks 2 or 4
+        u = (draws >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+        target = (u * counts).astype(np.int64)
+        cells = np.argmax(np.cumsum(empty, axis=1) > target[:, None], axis=1)
+        values = 1 + (draws & np.uint64(1)).astype(EXPONENT)
+        rows = np.nonzero(mask)[0]
+        flat[rows, cells[rows]] = values[rows]
+
+    def move(self, actions):
+        """Apply one direction per board (see DIRECTIONS) and spawn tiles.
+
+        Returns (score gained, whether each board changed).
+        """
+        actions = np.asarray(actions)
+        gained = np.zeros(self.batch_size, dtype=np.int64)
+        before = self.boards.copy()
+        for direction in range(4):
+            rows = np.nonzero(actions == direction)[0]
+            if not len(rows):
+                continue
+            cells = np.ascontiguousarray(to_left(self.boards[rows], direction))
+            cells, score = slide_left(cells)
+            self.boards[rows] = from_left(cells, direction)
+            gained[rows] = score
+        changed = (self.boards != before).any(axis=(1, 2))
+        self.scores += gained
+        # Like Game.move, a tile spawns after every move
+        self.add_tiles(np.ones(self.batch_size, dtype=bool))
+        return gained, changed
+
+    def game_over(self):
+        b = self.boards
+        has_empty = (b == 0).any(axis=(1, 2))
+        has_pair = (b[:, :, 1:] == b[:, :, :-1]).any(axis=(1, 2)) | (b[:, 1:, :] == b[:, :-1, :]).any(axis=(1, 2))
+        return ~(has_empty | has_pair)
+
+    def max_tiles(self):
+        return np.left_shift(1, self.boards.max(axis=(1, 2)).astype(np.int64))
+
+
+def random_rollouts(batch_size, grid_size, steps, seed=0):
+    """Play random moves on a batch. Returns (game, moves per second)."""
+    game = BatchGame(batch_size, grid_size, seed)
+    actions = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.move(actions.integers(0, 4, batch_size))
+    return game, batch_size * steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched 2048 random rollouts')
+    parser.add_argument('--batch', type=int, default=4096)
+    parser.add_argument('--grid', type=int, default=GRID_SIZE)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+
+    game_module = importlib.import_module('2048')
+
+    game = game_module.Game()
+    start = time.perf_counter()
+    for _ in range(20000):
+        game.move(random.choice(DIRECTIONS))
+    print(f"Game.move one board at a time: {20000 / (time.perf_counter() - start):,.0f} moves/s (4x4)")
+
+    game, rate = random_rollouts(args.batch, args.grid, args.steps)
+    print(f"BatchGame: {rate:,.0f} moves/s ({args.batch} boards, {args.grid}x{args.grid}), "
+          f"{game.game_over().sum()} games over, best tile {game.max_tiles().max()}")
+
+
+if __name__ == "__main__":
+    main()
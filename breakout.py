@@ -1,18 +1,29 @@
-import pygame
+import argparse
 import random
+import time
+
+import pygame
 
-# Initialize Pygame
-pygame.init()
+import physics
+import textcache
 
 # Constants
 WIDTH, HEIGHT = 800, 600
 FPS = 60
 BALL_SPEED = 5
+BALL_SIZE = 15
 PADDLE_SPEED = 10
 BRICK_WIDTH = 75
 BRICK_HEIGHT = 20
 BRICK_ROWS = 5
 BRICK_COLS = 10
+BRICK_TOP = 50  # Offset for the top margin
+MAX_DIRTY_RECTS = 200  # Past this many changed rects a frame is redrawn whole
+
+FONT = ('Arial', 36)
+
+# The ball bounces off the top and sides, and is lost at the bottom
+WALLS = physics.walls(WIDTH, HEIGHT, ('top', 'left', 'right'))
 
 # Colors
 WHITE = (255, 255, 255)
@@ -24,20 +35,9 @@ def random_color():
     return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
 # Ball Class
-class Ball:
+class Ball(physics.Body):
     def __init__(self):
-        self.rect = pygame.Rect(WIDTH // 2, HEIGHT // 2, 15, 15)
-        self.dx = BALL_SPEED
-        self.dy = -BALL_SPEED
-
-    def move(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
-
-        if self.rect.top <= 0:
-            self.dy = -self.dy
-        if self.rect.left <= 0 or self.rect.right >= WIDTH:
-            self.dx = -self.dx
+        super().__init__(WIDTH // 2, HEIGHT // 2, BALL_SIZE, BALL_SIZE, BALL_SPEED, -BALL_SPEED)
 
 # Paddle Class
 class Paddle:
@@ -57,9 +57,67 @@ class Brick:
         self.rect = pygame.Rect(x, y, BRICK_WIDTH, BRICK_HEIGHT)
         self.color = random_color()  # Assign a random color to the brick
 
+# Bricks sit on a grid of BRICK_WIDTH x BRICK_HEIGHT cells, so they are kept
+# in a 2D array. A collision query only looks at the cells a rect overlaps
+# and removing a brick just clears its cell.
+class BrickGrid:
+    def __init__(self, rows=BRICK_ROWS, cols=BRICK_COLS, left=0, top=BRICK_TOP):
+        self.rows = rows
+        self.cols = cols
+        self.left = left
+        self.top = top
+        self.cells = [[None] * cols for _ in range(rows)]
+        self.count = 0
+
+    def add(self, row, col):
+        brick = Brick(self.left + col * BRICK_WIDTH, self.top + row * BRICK_HEIGHT)
+        self.cells[row][col] = brick
+        self.count += 1
+        return brick
+
+    def remove(self, brick):
+        col = (brick.rect.x - self.left) // BRICK_WIDTH
+        row = (brick.rect.y - self.top) // BRICK_HEIGHT
+        self.cells[row][col] = None
+        self.count -= 1
+
+    def span(self, rect):
+        """Return the row and column ranges of the cells rect overlaps."""
+        row0 = max((rect.top - self.top) // BRICK_HEIGHT, 0)
+        row1 = min((rect.bottom - 1 - self.top) // BRICK_HEIGHT, self.rows - 1)
+        col0 = max((rect.left - self.left) // BRICK_WIDTH, 0)
+        col1 = min((rect.right - 1 - self.left) // BRICK_WIDTH, self.cols - 1)
+        return range(row0, row1 + 1), range(col0, col1 + 1)
+
+    def hit(self, rect):
+        """Return the first brick (in row order) that rect collides with, or None."""
+        rows, cols = self.span(rect)
+        for row in rows:
+            for col in cols:
+                brick = self.cells[row][col]
+                if brick is not None and rect.colliderect(brick.rect):
+                    return brick
+        return None
+
+    def within(self, rect):
+        """Return the bricks in the cells rect overlaps."""
+        rows, cols = self.span(rect)
+        return [self.cells[row][col] for row in rows for col in cols if self.cells[row][col] is not None]
+
+    def __iter__(self):
+        for row in self.cells:
+            for brick in row:
+                if brick is not None:
+                    yield brick
+
+    def __len__(self):
+        return self.count
+
 # Game Class
 class Game:
-    def __init__(self):
+    def __init__(self, rows=BRICK_ROWS, cols=BRICK_COLS):
+        self.rows = rows
+        self.cols = cols
         self.ball = Ball()
         self.paddle = Paddle()
         self.bricks = self.create_bricks()
@@ -67,48 +125,93 @@ class Game:
         self.game_over = False
 
     def create_bricks(self):
-        bricks = []
-        for row in range(BRICK_ROWS):
-            for col in range(BRICK_COLS):
-                x = col * BRICK_WIDTH
-                y = row * BRICK_HEIGHT + 50  # Offset for the top margin
-                bricks.append(Brick(x, y))
+        bricks = BrickGrid(self.rows, self.cols)
+        for row in range(self.rows):
+            for col in range(self.cols):
+                bricks.add(row, col)
+        # The brick field is drawn once into a background layer, which is
+        # only patched when a brick goes
+        self.background = None
+        self.erased = []
+        self.drawn = []
         return bricks
 
-    def draw(self, screen):
+    def remove_brick(self, brick):
+        self.bricks.remove(brick)
+        self.erased.append(brick.rect)
+
+    def render_background(self):
+        background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        background.fill(WHITE)
+        for brick in self.bricks:
+            pygame.draw.rect(background, brick.color, brick.rect)  # Use brick's random color
+        return background
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the parts of the frame that changed and return the rects to update."""
+        if self.background is None:
+            self.background = self.render_background()
+            self.erased = []
+            self.drawn = [screen.get_rect()]
+        for rect in self.erased:
+            self.background.fill(WHITE, rect)
+        # Restore the background under last frame's sprites and removed bricks
+        dirty = self.drawn + self.erased
+        if len(dirty) > MAX_DIRTY_RECTS:
+            dirty = [screen.get_rect()]
+        screen.blits([(self.background, rect, rect) for rect in dirty], False)
+        self.erased = []
+
+        drawn = [pygame.draw.rect(screen, BLUE, self.paddle.rect)]
+        drawn += self.draw_balls(screen, alpha)
+        drawn.append(screen.blit(textcache.render(FONT, f'Score: {self.score}', (0, 0, 0)), (10, 10)))
+        if self.game_over:
+            over_surface = textcache.render(FONT, "Game Over! Press R to Restart", (0, 0, 0))
+            drawn.append(screen.blit(over_surface, (WIDTH // 2 - 150, HEIGHT // 2)))
+        self.drawn = drawn
+        rects = dirty + drawn
+        return rects if len(rects) <= MAX_DIRTY_RECTS else [screen.get_rect()]
+
+    def draw_full(self, screen, alpha=1.0):
+        """Redraw the whole frame from scratch, as Breakout used to every frame."""
         screen.fill(WHITE)
         pygame.draw.rect(screen, BLUE, self.paddle.rect)
-        pygame.draw.ellipse(screen, RED, self.ball.rect)
+        self.draw_balls(screen, alpha)
 
         for brick in self.bricks:
             pygame.draw.rect(screen, brick.color, brick.rect)  # Use brick's random color
 
-        font = pygame.font.SysFont('Arial', 36)
-        score_surface = font.render(f'Score: {self.score}', True, (0, 0, 0))
+        score_surface = textcache.render(FONT, f'Score: {self.score}', (0, 0, 0))
         screen.blit(score_surface, (10, 10))
 
         if self.game_over:
-            over_surface = font.render("Game Over! Press R to Restart", True, (0, 0, 0))
+            over_surface = textcache.render(FONT, "Game Over! Press R to Restart", (0, 0, 0))
             screen.blit(over_surface, (WIDTH // 2 - 150, HEIGHT // 2))
 
+    def draw_balls(self, screen, alpha=1.0):
+        """Draw the ball and return the rects drawn."""
+        return [pygame.draw.ellipse(screen, RED, self.ball.interpolated(alpha))]
+
+    def obstacles(self, area):
+        return WALLS + [self.paddle] + self.bricks.within(area)
+
+    def hit(self, obj, nx, ny):
+        if obj is self.paddle:
+            # Calculate hit position
+            hit_pos = (self.ball.x + BALL_SIZE / 2 - self.paddle.rect.left) / self.paddle.rect.width
+            self.ball.dx = (hit_pos - 0.5) * 2 * BALL_SPEED  # Change direction based on hit position
+            self.ball.dy = -BALL_SPEED  # Always bounce upwards
+        elif isinstance(obj, Brick):
+            self.remove_brick(obj)
+            self.score += 1
+
     def update(self):
         if not self.game_over:
-            self.ball.move()
-
-            # Ball and paddle collision
-            if self.ball.rect.colliderect(self.paddle.rect):
-                # Calculate hit position
-                hit_pos = (self.ball.rect.centerx - self.paddle.rect.left) / self.paddle.rect.width
-                self.ball.dx = (hit_pos - 0.5) * 2 * BALL_SPEED  # Change direction based on hit position
-                self.ball.dy = -BALL_SPEED  # Always bounce upwards
-
-            # Ball and brick collision
-            for brick in self.bricks[:]:
-                if self.ball.rect.colliderect(brick.rect):
-                    self.bricks.remove(brick)
-                    self.ball.dy = -self.ball.dy
-                    self.score += 1
-                    break  # Break after one collision
+            # The paddle may have moved into the ball
+            if self.ball.dy > 0 and self.ball.rect.colliderect(self.paddle.rect):
+                self.hit(self.paddle, 0, -1)
+            # The ball bounces off walls, the paddle and bricks along its whole path
+            physics.move(self.ball, self.obstacles, self.hit)
 
             # Check if the ball goes out of bounds
             if self.ball.rect.bottom >= HEIGHT:
@@ -121,11 +224,80 @@ class Game:
         self.score = 0
         self.game_over = False
 
-def main():
+def list_hit(bricks, rect):
+    """The old collision test: scan a copy of the brick list, remove the first hit."""
+    for brick in bricks[:]:
+        if rect.colliderect(brick.rect):
+            bricks.remove(brick)
+            return brick
+    return None
+
+def benchmark(sizes, frames, seed=0):
+    """Compare per-frame brick collision cost of a plain list and BrickGrid."""
+    for size in sizes:
+        cols = max(int((size * 4) ** 0.5), 1)
+        rows = -(-size // cols)
+        grid = Game(rows, cols).bricks
+        bricks = list(grid)
+        rng = random.Random(seed)
+        width, height = cols * BRICK_WIDTH, rows * BRICK_HEIGHT
+        balls = [pygame.Rect(rng.randrange(width), BRICK_TOP + rng.randrange(height), BALL_SIZE, BALL_SIZE) for _ in range(frames)]
+
+        start = time.perf_counter()
+        list_hits = [list_hit(bricks, rect) for rect in balls]
+        list_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        grid_hits = []
+        for rect in balls:
+            brick = grid.hit(rect)
+            if brick is not None:
+                grid.remove(brick)
+            grid_hits.append(brick)
+        grid_time = time.perf_counter() - start
+
+        assert list_hits == grid_hits
+        print(f"{rows * cols:6d} bricks: list {list_time / frames * 1e6:9.1f} us/frame, "
+              f"grid {grid_time / frames * 1e6:6.1f} us/frame")
+
+def draw_benchmark(frames, rows_list=(BRICK_ROWS, 20)):
+    """Compare the frame time of full redraws against cached bricks with dirty rects."""
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    for rows in rows_list:
+        for name in ('full', 'dirty'):
+            random.seed(0)
+            game = Game(rows)
+            wall = cpu = 0.0
+            for _ in range(frames):
+                # Keep the paddle under the ball so the game keeps going
+                game.paddle.rect.centerx = game.ball.rect.centerx
+                game.paddle.move(0)
+                game.update()
+                if game.game_over:
+                    game.reset()
+                start, start_cpu = time.perf_counter(), time.process_time()
+                if name == 'full':
+                    game.draw_full(screen)
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(game.draw(screen))
+                wall += time.perf_counter() - start
+                cpu += time.process_time() - start_cpu
+            print(f"{rows * BRICK_COLS:4d} bricks, {name:5s} redraw: {wall / frames * 1e3:6.3f} ms/frame, "
+                  f"{cpu / frames * 1e3:6.3f} ms CPU/frame")
+    print(f"text cache: {textcache.stats()}")
+    pygame.quit()
+
+def play(new_game=Game, fps=FPS):
+    pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('Breakout Game')
-    game = Game()
+    game = new_game()
     clock = pygame.time.Clock()
+    # The simulation runs in fixed steps however fast frames are drawn
+    stepper = physics.FixedStep()
+    last = time.perf_counter()
 
     while True:
         for event in pygame.event.get():
@@ -133,21 +305,37 @@ def main():
                 pygame.quit()
                 return
 
+        now = time.perf_counter()
+        steps = stepper.advance(now - last)
+        last = now
+
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT]:
-            game.paddle.move(-PADDLE_SPEED)
-        if keys[pygame.K_RIGHT]:
-            game.paddle.move(PADDLE_SPEED)
-
-        if not game.game_over:
-            game.update()
-        else:
-            if keys[pygame.K_r]:  # Restart game
-                game.reset()
-
-        game.draw(screen)
-        pygame.display.flip()
-        clock.tick(FPS)
+        for _ in range(steps):
+            if keys[pygame.K_LEFT]:
+                game.paddle.move(-PADDLE_SPEED)
+            if keys[pygame.K_RIGHT]:
+                game.paddle.move(PADDLE_SPEED)
+            if not game.game_over:
+                game.update()
+        if game.game_over and keys[pygame.K_r]:  # Restart game
+            game.reset()
+
+        pygame.display.update(game.draw(screen, stepper.alpha))
+        clock.tick(fps)
+
+def main():
+    parser = argparse.ArgumentParser(description='Breakout')
+    parser.add_argument('--bench', action='store_true', help='benchmark brick collisions headless')
+    parser.add_argument('--bench-draw', action='store_true', help='compare full and dirty-rect frame times')
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--fps', type=int, default=FPS, help='frames drawn per second; the simulation rate is fixed')
+    args = parser.parse_args()
+    if args.bench:
+        benchmark([50, 500, 2000, 10000], args.frames)
+    elif args.bench_draw:
+        draw_benchmark(args.frames)
+    else:
+        play(fps=args.fps)
 
 if __name__ == "__main__":
     main()
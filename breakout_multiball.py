@@ -0,0 +1,253 @@
+import argparse
+import math
+import time
+
+import numpy as np
+import pygame
+
+import breakout
+import physics
+from breakout import Game, WIDTH, HEIGHT, BALL_SPEED, BALL_SIZE, BRICK_WIDTH, BRICK_HEIGHT, RED
+
+# Multi-ball Breakout. Ball positions and velocities live in NumPy arrays and
+# every step sweeps all balls at once against the walls, the paddle and the
+# bricks, with the same swept-AABB rule as physics.sweep, so fast balls can't
+# tunnel. Brick lookups go through a boolean array mirroring the brick grid,
+# so each ball only checks the few cells its move covers. Every brick broken
+# splits the ball that broke it, up to MAX_BALLS.
+
+MAX_BALLS = 5000
+SPLIT = 2  # Extra balls released per brick broken
+SPLIT_ANGLE = math.radians(20)
+# The new balls fan out at +1, -1, +2, -2, ... times SPLIT_ANGLE
+SPLIT_OFFSETS = np.array([SPLIT_ANGLE * (i // 2 + 1) * (-1) ** i for i in range(SPLIT)])
+# What a ball ran into, besides the brick cells numbered from 0
+NOTHING, WALL, PADDLE = -1, -2, -3
+
+
+def sweep(x, y, w, h, dx, dy, left, top, right, bottom):
+    """physics.sweep for arrays of w x h boxes, each against its own rect.
+
+    Returns arrays (t, nx, ny), with t = inf where a box does not reach its
+    rect within this move.
+    """
+    left, top = left - w, top - h
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tx0, tx1 = (left - x) / dx, (right - x) / dx
+        ty0, ty1 = (top - y) / dy, (bottom - y) / dy
+    # A box not moving on an axis overlaps the rect on it for all time, or never
+    always_x = np.where((left < x) & (x < right), -np.inf, np.inf)
+    always_y = np.where((top < y) & (y < bottom), -np.inf, np.inf)
+    x_entry = np.where(dx != 0, np.minimum(tx0, tx1), always_x)
+    x_exit = np.where(dx != 0, np.maximum(tx0, tx1), -always_x)
+    y_entry = np.where(dy != 0, np.minimum(ty0, ty1), always_y)
+    y_exit = np.where(dy != 0, np.maximum(ty0, ty1), -always_y)
+
+    entry = np.maximum(x_entry, y_entry)
+    hit = (entry <= np.minimum(x_exit, y_exit)) & (entry >= 0) & (entry < 1)
+    on_x = hit & (x_entry > y_entry)
+    on_y = hit & ~on_x
+    nx = np.where(on_x, -np.sign(dx), 0.0)
+    ny = np.where(on_y, -np.sign(dy), 0.0)
+    return np.where(hit, entry, np.inf), nx, ny
+
+
+class MultiBallGame(Game):
+    def __init__(self, rows=breakout.BRICK_ROWS, cols=breakout.BRICK_COLS, max_balls=MAX_BALLS):
+        self.max_balls = max_balls
+        super().__init__(rows, cols)
+        self.reset_balls()
+        self.ball_surface = None
+
+    def reset_balls(self):
+        self.x = np.array([self.ball.x])
+        self.y = np.array([self.ball.y])
+        self.dx = np.array([float(self.ball.dx)])
+        self.dy = np.array([float(self.ball.dy)])
+        self.prev_x, self.prev_y = self.x.copy(), self.y.copy()
+
+    def create_bricks(self):
+        bricks = super().create_bricks()
+        self.alive = np.ones((self.rows, self.cols), dtype=bool)
+        return bricks
+
+    def reset(self):
+        super().reset()
+        self.reset_balls()
+
+    def first_hits(self, x, y, dx, dy):
+        """Sweep balls moving by (dx, dy) against everything they could hit.
+
+        Returns (t, nx, ny, target) for the first contact of each ball, where
+        target is the flat grid cell of a brick, PADDLE, WALL or NOTHING.
+        """
+        t = np.full(len(x), np.inf)
+        nx, ny = np.zeros(len(x)), np.zeros(len(x))
+        target = np.full(len(x), NOTHING)
+        if not len(x):
+            return t, nx, ny, target
+        solids = [(wall.rect, WALL) for wall in breakout.WALLS] + [(self.paddle.rect, PADDLE)]
+        for rect, kind in solids:
+            hit_t, hit_nx, hit_ny = sweep(x, y, BALL_SIZE, BALL_SIZE, dx, dy,
+                                          rect.left, rect.top, rect.right, rect.bottom)
+            closer = hit_t < t
+            t[closer], nx[closer], ny[closer] = hit_t[closer], hit_nx[closer], hit_ny[closer]
+            target[closer] = kind
+
+        # Bricks in the cells the swept box covers, one cell offset at a time
+        grid = self.bricks
+        alive = self.alive.ravel()
+        x0, x1 = np.minimum(x, x + dx) - grid.left, np.maximum(x, x + dx) + BALL_SIZE - grid.left
+        y0, y1 = np.minimum(y, y + dy) - grid.top, np.maximum(y, y + dy) + BALL_SIZE - grid.top
+        col0, col1 = np.floor(x0 / BRICK_WIDTH).astype(np.int64), np.floor(x1 / BRICK_WIDTH).astype(np.int64)
+        row0, row1 = np.floor(y0 / BRICK_HEIGHT).astype(np.int64), np.floor(y1 / BRICK_HEIGHT).astype(np.int64)
+        for dr in range(int((row1 - row0).max()) + 1):
+            for dc in range(int((col1 - col0).max()) + 1):
+                row, col = row0 + dr, col0 + dc
+                inside = (row <= row1) & (col <= col1) & (row >= 0) & (row < grid.rows) & (col >= 0) & (col < grid.cols)
+                flat = np.where(inside, row * grid.cols + col, 0)
+                near = np.nonzero(inside & alive[flat])[0]
+                if not len(near):
+                    continue
+                left = grid.left + col[near] * BRICK_WIDTH
+                top = grid.top + row[near] * BRICK_HEIGHT
+                hit_t, hit_nx, hit_ny = sweep(x[near], y[near], BALL_SIZE, BALL_SIZE, dx[near], dy[near],
+                                              left, top, left + BRICK_WIDTH, top + BRICK_HEIGHT)
+                closer = hit_t < t[near]
+                near, flat = near[closer], flat[near][closer]
+                t[near], nx[near], ny[near] = hit_t[closer], hit_nx[closer], hit_ny[closer]
+                target[near] = flat
+        return t, nx, ny, target
+
+    def bounce_off_paddle(self, balls):
+        # The same angle rule as Game.hit
+        paddle = self.paddle.rect
+        hit_pos = (self.x[balls] + BALL_SIZE / 2 - paddle.left) / paddle.width
+        self.dx[balls] = (hit_pos - 0.5) * 2 * BALL_SPEED
+        self.dy[balls] = -BALL_SPEED
+
+    def update(self):
+        if self.game_over:
+            return
+        self.prev_x, self.prev_y = self.x.copy(), self.y.copy()
+
+        # The paddle may have moved into a ball
+        paddle = self.paddle.rect
+        touching = ((self.x < paddle.right) & (self.x + BALL_SIZE > paddle.left) &
+                    (self.y < paddle.bottom) & (self.y + BALL_SIZE > paddle.top))
+        self.bounce_off_paddle(np.nonzero(touching & (self.dy > 0))[0])
+
+        # Like physics.move: run each ball to its first contact, bounce, and
+        # carry on with the rest of its step, up to MAX_HITS contacts
+        splitting = []
+        moving = np.arange(len(self.x))
+        remaining = np.ones(len(self.x))
+        for _ in range(physics.MAX_HITS):
+            dx, dy = self.dx[moving] * remaining, self.dy[moving] * remaining
+            t, nx, ny, target = self.first_hits(self.x[moving], self.y[moving], dx, dy)
+            hit = t < np.inf
+            free = moving[~hit]
+            self.x[free] += dx[~hit]
+            self.y[free] += dy[~hit]
+            moving, remaining = moving[hit], remaining[hit]
+            if not len(moving):
+                break
+            t, nx, ny, target = t[hit], nx[hit], ny[hit], target[hit]
+            self.x[moving] += dx[hit] * t
+            self.y[moving] += dy[hit] * t
+            self.dx[moving] = np.where(nx != 0, np.abs(self.dx[moving]) * nx, self.dx[moving])
+            self.dy[moving] = np.where(ny != 0, np.abs(self.dy[moving]) * ny, self.dy[moving])
+            self.bounce_off_paddle(moving[target == PADDLE])
+
+            # Every ball touching a brick bounces, and each brick breaks once
+            on_brick = np.nonzero(target >= 0)[0]
+            broken, first = np.unique(target[on_brick], return_index=True)
+            for flat in broken.tolist():
+                row, col = divmod(flat, self.cols)
+                self.alive[row, col] = False
+                self.remove_brick(self.bricks.cells[row][col])
+            self.score += len(broken)
+            splitting.append(moving[on_brick[first]])
+            remaining *= 1 - t
+        if splitting:
+            self.split(np.concatenate(splitting))
+
+        # Balls leaving the bottom are lost
+        kept = self.y + BALL_SIZE < HEIGHT
+        if not kept.all():
+            self.x, self.y, self.dx, self.dy = self.x[kept], self.y[kept], self.dx[kept], self.dy[kept]
+            self.prev_x, self.prev_y = self.prev_x[kept], self.prev_y[kept]
+        self.game_over = len(self.x) == 0
+
+    def split(self, balls):
+        """Release SPLIT extra balls from each listed ball, fanned out around its direction."""
+        balls = balls[:max(self.max_balls - len(self.x), 0) // SPLIT]
+        if not len(balls):
+            return
+        speed = np.hypot(self.dx[balls], self.dy[balls])
+        angle = np.arctan2(self.dy[balls], self.dx[balls])
+        angles = (angle[:, None] + SPLIT_OFFSETS).ravel()
+        x, y = np.repeat(self.x[balls], SPLIT), np.repeat(self.y[balls], SPLIT)
+        self.x = np.concatenate([self.x, x])
+        self.y = np.concatenate([self.y, y])
+        # New balls appear where they split off, without interpolating
+        self.prev_x = np.concatenate([self.prev_x, x])
+        self.prev_y = np.concatenate([self.prev_y, y])
+        self.dx = np.concatenate([self.dx, np.repeat(speed, SPLIT) * np.cos(angles)])
+        self.dy = np.concatenate([self.dy, np.repeat(speed, SPLIT) * np.sin(angles)])
+
+    def draw_balls(self, screen, alpha=1.0):
+        if self.ball_surface is None:
+            self.ball_surface = pygame.Surface((BALL_SIZE, BALL_SIZE), pygame.SRCALPHA)
+            pygame.draw.ellipse(self.ball_surface, RED, self.ball_surface.get_rect())
+        surface = self.ball_surface
+        x = np.round(self.prev_x + (self.x - self.prev_x) * alpha).astype(int)
+        y = np.round(self.prev_y + (self.y - self.prev_y) * alpha).astype(int)
+        return screen.blits([(surface, pos) for pos in zip(x.tolist(), y.tolist())])
+
+
+def benchmark(counts, frames, seed=0):
+    """Report the mean update and whole frame time for different numbers of balls."""
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    rng = np.random.default_rng(seed)
+    for count in counts:
+        game = MultiBallGame(rows=20, max_balls=count)
+        # A paddle across the whole floor keeps every ball in play
+        game.paddle.rect = pygame.Rect(0, HEIGHT - 30, WIDTH, 10)
+        angle = rng.uniform(0.2, math.pi - 0.2, count)
+        game.x = rng.uniform(0, WIDTH - BALL_SIZE, count)
+        game.y = rng.uniform(HEIGHT // 2, HEIGHT - 60, count)
+        game.dx = BALL_SPEED * np.cos(angle)
+        game.dy = -BALL_SPEED * np.sin(angle)
+        broken = 0
+        updating = 0.0
+        start = time.perf_counter()
+        for _ in range(frames):
+            if not game.bricks:
+                broken += game.score
+                game.score = 0
+                game.bricks = game.create_bricks()
+            step = time.perf_counter()
+            game.update()
+            updating += time.perf_counter() - step
+            pygame.display.update(game.draw(screen, 0.5))
+        elapsed = time.perf_counter() - start
+        print(f"{count:6d} balls: {elapsed / frames * 1e3:6.3f} ms/frame, {updating / frames * 1e3:6.3f} ms of it "
+              f"updating ({broken + game.score} bricks broken in {frames} frames)")
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-ball Breakout')
+    parser.add_argument('--bench', action='store_true', help='benchmark frames against ball count headless')
+    parser.add_argument('--frames', type=int, default=600)
+    args = parser.parse_args()
+    if args.bench:
+        benchmark([1, 10, 100, 1000, 5000, 20000], args.frames)
+    else:
+        breakout.play(MultiBallGame)
+
+
+if __name__ == "__main__":
+    main()
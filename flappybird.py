@@ -1,16 +1,17 @@
+import argparse
+import math
+import time
+
 import pygame
-import random
 
-# Initialize Pygame
-pygame.init()
+import textcache
+from flappybird_core import FlappyBird, WIDTH, HEIGHT, PIPE_WIDTH, PIPE_GAP, PIPE_SPEED, BIRD_X, BIRD_SIZE, autopilot
 
 # Constants
-WIDTH, HEIGHT = 1919, 1020
 FPS = 60
-GRAVITY = 0.25
-JUMP_STRENGTH = 10
-PIPE_WIDTH = 300
-PIPE_GAP = 500
+PIXEL_SCALE = 4  # Window pixels per internal pixel the scene is drawn at
+
+FONT = ('Arial', 36)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -18,114 +19,167 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 BLACK = (0, 0, 0)
 
-# Bird Class
-class Bird:
-    def __init__(self):
-        self.rect = pygame.Rect(100, HEIGHT // 2, 30, 30)
-        self.y_velocity = 0
-
-    def jump(self):
-        self.y_velocity = -JUMP_STRENGTH
-
-    def move(self):
-        self.y_velocity += GRAVITY
-        self.rect.y += self.y_velocity
-
-# Pipe Class
-class Pipe:
-    def __init__(self, x):
-        self.x = x
-        self.height = random.randint(100, HEIGHT - 100 - PIPE_GAP)
-        self.rect_top = pygame.Rect(self.x, self.height - HEIGHT, PIPE_WIDTH, HEIGHT)
-        self.rect_bottom = pygame.Rect(self.x, self.height + PIPE_GAP, PIPE_WIDTH, HEIGHT)
-
-    def move(self):
-        self.x -= 5
-        self.rect_top.x = self.x
-        self.rect_bottom.x = self.x
-
-    def is_off_screen(self):
-        return self.x < -PIPE_WIDTH
-
-# Game Class
-class Game:
-    def __init__(self):
-        self.bird = Bird()
-        self.pipes = []
-        self.score = 0
-        self.clock = pygame.time.Clock()
-        self.frames = 0
-        self.game_over = False
-
-    def spawn_pipe(self):
-        self.pipes.append(Pipe(WIDTH))
-
-    def draw(self, screen):
-        screen.fill(BLUE)
-        pygame.draw.rect(screen, GREEN, self.bird.rect)
-        for pipe in self.pipes:
-            pygame.draw.rect(screen, GREEN, pipe.rect_top)
-            pygame.draw.rect(screen, GREEN, pipe.rect_bottom)
-
-        font = pygame.font.SysFont('Arial', 36)
-        score_surface = font.render(str(self.score), True, WHITE)
-        screen.blit(score_surface, (WIDTH // 2, 10))
-
-        if self.game_over:
-            over_surface = font.render("Game Over! Press R to Restart", True, WHITE)
-            screen.blit(over_surface, (WIDTH // 2 - 150, HEIGHT // 2))
-
-    def update(self):
-        if not self.game_over:
-            self.bird.move()
-
-            if self.frames % 60 == 0:
-                self.spawn_pipe()
-
-            for pipe in self.pipes:
-                pipe.move()
-                if pipe.is_off_screen():
-                    self.pipes.remove(pipe)
-                    self.score += 1
-
-    def check_collision(self):
-        for pipe in self.pipes:
-            if self.bird.rect.colliderect(pipe.rect_top) or self.bird.rect.colliderect(pipe.rect_bottom):
-                return True
-        return self.bird.rect.top < 0 or self.bird.rect.bottom > HEIGHT
-
-    def reset(self):
-        self.bird = Bird()
-        self.pipes = []
-        self.score = 0
-        self.frames = 0
-        self.game_over = False
+def draw(screen, game):
+    """Draw the whole frame directly at window resolution."""
+    screen.fill(BLUE)
+    pygame.draw.rect(screen, GREEN, (BIRD_X, game.bird_y, BIRD_SIZE, BIRD_SIZE))
+    for x, height in game.pipes():
+        pygame.draw.rect(screen, GREEN, (x, height - HEIGHT, PIPE_WIDTH, HEIGHT))
+        pygame.draw.rect(screen, GREEN, (x, height + PIPE_GAP, PIPE_WIDTH, HEIGHT))
+
+    score_surface = textcache.render(FONT, str(game.score), WHITE)
+    screen.blit(score_surface, (WIDTH // 2, 10))
+
+    if game.game_over:
+        over_surface = textcache.render(FONT, "Game Over! Press R to Restart", WHITE)
+        screen.blit(over_surface, (WIDTH // 2 - 150, HEIGHT // 2))
+
+# Draws the game in world coordinates onto a small internal surface, which is
+# scaled up to the window. Between frames only the bird, the text and the
+# thin strips at pipe edges that scrolled are redrawn and scaled. The scale
+# is a whole number so a scaled piece matches the same part of a full scale;
+# any leftover window pixels form a border.
+class Renderer:
+    def __init__(self, window, scale=PIXEL_SCALE):
+        self.window = window
+        self.scale = scale
+        ww, wh = window.get_size()
+        size = (ww // scale, wh // scale)
+        self.surface = pygame.Surface(size).convert()
+        self.area = pygame.Rect(0, 0, size[0] * scale, size[1] * scale)
+        self.area.center = window.get_rect().center
+        self.sx, self.sy = size[0] / WIDTH, size[1] / HEIGHT
+        self.font = (FONT[0], max(round(FONT[1] * self.sy), 8))
+        self.frames = None  # Frame on screen, None to redraw everything
+        self.sprites = []  # Internal rects of the bird and text on screen
+
+    def rect(self, x, y, w, h):
+        """Return the internal pixels covered by a world rect."""
+        left, top = math.floor(x * self.sx), math.floor(y * self.sy)
+        return pygame.Rect(left, top, math.ceil((x + w) * self.sx) - left, math.ceil((y + h) * self.sy) - top)
+
+    def window_rect(self, rect):
+        """Return the window pixels an internal rect scales to."""
+        scale = self.scale
+        return pygame.Rect(self.area.x + rect.x * scale, self.area.y + rect.y * scale, rect.w * scale, rect.h * scale)
+
+    def texts(self, game):
+        """Return the (surface, internal position) of each line of text."""
+        texts = [(textcache.render(self.font, str(game.score), WHITE), self.rect(WIDTH // 2, 10, 0, 0).topleft)]
+        if game.game_over:
+            over_surface = textcache.render(self.font, "Game Over! Press R to Restart", WHITE)
+            texts.append((over_surface, self.rect(WIDTH // 2 - 150, HEIGHT // 2, 0, 0).topleft))
+        return texts
+
+    def sprites_of(self, game):
+        """Return the internal rects of the bird and text."""
+        rects = [self.rect(BIRD_X, game.bird_y, BIRD_SIZE, BIRD_SIZE)]
+        rects += [surface.get_rect(topleft=pos) for surface, pos in self.texts(game)]
+        return rects
+
+    def draw_scene(self, game):
+        surface = self.surface
+        surface.fill(BLUE)
+        for x, height in game.pipes():
+            pygame.draw.rect(surface, GREEN, self.rect(x, height - HEIGHT, PIPE_WIDTH, HEIGHT))
+            pygame.draw.rect(surface, GREEN, self.rect(x, height + PIPE_GAP, PIPE_WIDTH, HEIGHT))
+        pygame.draw.rect(surface, GREEN, self.rect(BIRD_X, game.bird_y, BIRD_SIZE, BIRD_SIZE))
+        surface.blits(self.texts(game), False)
+
+    def draw(self, game, partial=True):
+        """Draw a frame and return the window rects that changed."""
+        sprites = self.sprites_of(game)
+        if not partial or self.frames is None or game.frames < self.frames:
+            if self.frames is None:
+                self.window.fill(BLACK)  # Border
+            self.draw_scene(game)
+            self.sprites = sprites
+            self.frames = game.frames
+            pygame.transform.scale(self.surface, self.area.size, self.window.subsurface(self.area))
+            return [self.window.get_rect()]
+
+        # Pipes move PIPE_SPEED a frame, so only strips that wide at their
+        # edges change, along with wherever the bird and text were and are
+        dirty = self.sprites + sprites
+        for x, _ in game.pipes():
+            dirty.append(self.rect(x, 0, PIPE_SPEED, HEIGHT))
+            dirty.append(self.rect(x + PIPE_WIDTH, 0, PIPE_SPEED, HEIGHT))
+        bounds = self.surface.get_rect()
+        updated = []
+        for rect in dirty:
+            rect = rect.clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            target = self.window_rect(rect)
+            self.surface.set_clip(rect)
+            self.draw_scene(game)
+            pygame.transform.scale(self.surface.subsurface(rect), target.size, self.window.subsurface(target))
+            updated.append(target)
+        self.surface.set_clip(None)
+        self.sprites = sprites
+        self.frames = game.frames
+        return updated
+
+def benchmark(frames, scales):
+    """Time frames drawn directly, and through the renderer at several internal resolutions."""
+    window = pygame.display.set_mode((WIDTH, HEIGHT))
+    modes = [('direct', None, False)]
+    for scale in scales:
+        size = f'{WIDTH // scale}x{HEIGHT // scale}'
+        modes += [(f'{size} full', scale, False), (f'{size} partial', scale, True)]
+    for name, scale, partial in modes:
+        game = FlappyBird(0)
+        renderer = Renderer(window, scale) if scale else None
+        elapsed = 0.0
+        for _ in range(frames):
+            game.step(autopilot(game))
+            if game.game_over:
+                game.reset(game.frames)
+            start = time.perf_counter()
+            if renderer is None:
+                draw(window, game)
+                pygame.display.flip()
+            else:
+                pygame.display.update(renderer.draw(game, partial))
+            elapsed += time.perf_counter() - start
+        print(f"{name:18s} {elapsed / frames * 1e3:7.3f} ms/frame")
+    print(f"text cache: {textcache.stats()}")
 
 def main():
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    parser = argparse.ArgumentParser(description='Flappy Bird')
+    parser.add_argument('--scale', type=int, default=PIXEL_SCALE,
+                        help='window pixels per internal pixel; the scene is drawn at the window size divided by this')
+    parser.add_argument('--window', type=int, nargs=2, default=(WIDTH, HEIGHT), metavar=('W', 'H'))
+    parser.add_argument('--bench', type=int, metavar='FRAMES', help='benchmark frame times headless')
+    args = parser.parse_args()
+
+    pygame.init()
+    if args.bench:
+        benchmark(args.bench, [1, 2, 4, 8])
+        pygame.quit()
+        return
+
+    screen = pygame.display.set_mode(args.window)
     pygame.display.set_caption('Flappy Bird Clone')
-    game = Game()
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen, args.scale)
+    game = FlappyBird()
 
     while True:
+        flap = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    game.bird.jump()
+                    flap = True
                 if game.game_over and event.key == pygame.K_r:
                     game.reset()
 
-        game.update()
-        game.draw(screen)
-
-        if game.check_collision():
-            game.game_over = True
-
-        pygame.display.flip()
-        game.clock.tick(FPS)
-        game.frames += 1
+        game.step(flap)
+        pygame.display.update(renderer.draw(game))
+        clock.tick(FPS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+import argparse
+import random
+import time
+
+# Pure game logic for Flappy Bird. Nothing here imports pygame, so games can
+# be simulated headless; flappybird.py is the frontend. Pipes live in a
+# fixed ring buffer of slots that are reused, so a running game allocates no
+# new pipes.
+
+# Constants
+WIDTH, HEIGHT = 1919, 1020
+GRAVITY = 0.25
+JUMP_STRENGTH = 10
+PIPE_WIDTH = 300
+PIPE_GAP = 500
+PIPE_SPEED = 5
+PIPE_INTERVAL = 60  # Frames between pipes
+PIPE_MARGIN = 100  # Smallest pipe on either side of the gap
+BIRD_X = 100
+BIRD_SIZE = 30
+
+# A pipe is on screen from x = WIDTH until it passes x = -PIPE_WIDTH
+PIPE_CAPACITY = (WIDTH + PIPE_WIDTH) // (PIPE_SPEED * PIPE_INTERVAL) + 2
+
+
+def pixel(value):
+    """Round to a whole pixel the way pygame.Rect does (halves away from zero)."""
+    return int(value + 0.5) if value >= 0 else int(value - 0.5)
+
+
+class FlappyBird:
+    def __init__(self, seed=None):
+        self.pipe_x = [0] * PIPE_CAPACITY
+        self.pipe_height = [0] * PIPE_CAPACITY
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.rng = random.Random(seed)
+        self.bird_y = HEIGHT // 2
+        self.velocity = 0
+        self.first = 0  # Slot of the oldest pipe
+        self.count = 0
+        self.score = 0
+        self.frames = 0
+        self.game_over = False
+
+    def pipes(self):
+        """Yield (x, gap top) of each pipe from oldest to newest."""
+        for i in range(self.count):
+            slot = (self.first + i) % PIPE_CAPACITY
+            yield self.pipe_x[slot], self.pipe_height[slot]
+
+    def spawn_pipe(self):
+        slot = (self.first + self.count) % PIPE_CAPACITY
+        self.pipe_x[slot] = WIDTH
+        self.pipe_height[slot] = self.rng.randint(PIPE_MARGIN, HEIGHT - PIPE_MARGIN - PIPE_GAP)
+        self.count += 1
+
+    def jump(self):
+        self.velocity = -JUMP_STRENGTH
+
+    def update(self):
+        if self.game_over:
+            return 0
+        self.velocity += GRAVITY
+        self.bird_y = pixel(self.bird_y + self.velocity)
+        return self.advance_pipes()
+
+    def advance_pipes(self):
+        """Spawn and scroll pipes for this frame. Returns the number that left the screen."""
+        if self.frames % PIPE_INTERVAL == 0:
+            self.spawn_pipe()
+
+        for i in range(self.count):
+            self.pipe_x[(self.first + i) % PIPE_CAPACITY] -= PIPE_SPEED
+        # Pipes leave in the order they came, so only the oldest can be off screen
+        passed = 0
+        while self.count and self.pipe_x[self.first] < -PIPE_WIDTH:
+            self.first = (self.first + 1) % PIPE_CAPACITY
+            self.count -= 1
+            passed += 1
+        self.score += passed
+        return passed
+
+    def pipes_at_bird(self):
+        """Yield the gap top of each pipe overlapping the bird's column."""
+        for i in range(self.count):
+            slot = (self.first + i) % PIPE_CAPACITY
+            x = self.pipe_x[slot]
+            if x < BIRD_X + BIRD_SIZE and x + PIPE_WIDTH > BIRD_X:
+                yield self.pipe_height[slot]
+
+    def next_pipe(self):
+        """Return (x, gap top) of the first pipe the bird has not passed yet, or None."""
+        for x, height in self.pipes():
+            if x + PIPE_WIDTH > BIRD_X:
+                return x, height
+        return None
+
+    def check_collision(self):
+        top, bottom = self.bird_y, self.bird_y + BIRD_SIZE
+        for height in self.pipes_at_bird():
+            if top < height or bottom > height + PIPE_GAP:
+                return True
+        return top < 0 or bottom > HEIGHT
+
+    def step(self, flap=False):
+        """Advance one frame, flapping first if asked. Returns (points, game_over)."""
+        if flap:
+            self.jump()
+        points = self.update()
+        if self.check_collision():
+            self.game_over = True
+        self.frames += 1
+        return points, self.game_over
+
+
+def autopilot(game):
+    """Flap when the bird is about to sink too close to the bottom of the next gap."""
+    pipe = game.next_pipe()
+    height = pipe[1] if pipe else (HEIGHT - PIPE_GAP) // 2
+    return game.bird_y + BIRD_SIZE + game.velocity > height + PIPE_GAP - 60 and game.velocity >= 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the headless Flappy Bird core')
+    parser.add_argument('--steps', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game = FlappyBird(args.seed)
+    games = 1
+    best = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, over = game.step(autopilot(game))
+        if over:
+            best = max(best, game.score)
+            game.reset(args.seed + games)
+            games += 1
+    elapsed = time.perf_counter() - start
+    best = max(best, game.score)
+    print(f"{args.steps} steps in {elapsed:.2f}s = {args.steps / elapsed:,.0f} steps/s, "
+          f"{games} games, best score {best}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from flappybird_core import (FlappyBird, WIDTH, HEIGHT, GRAVITY, JUMP_STRENGTH, PIPE_GAP,
+                             BIRD_SIZE, BIRD_X)
+
+# Neuroevolution for Flappy Bird. A whole population flies through one pipe
+# stream (a FlappyBird core whose own bird is not used) with positions,
+# velocities and alive flags in arrays. Every bird has a small network, and
+# all of them are evaluated together as one batched matrix multiply per frame.
+# Independent species evolve in parallel on a process pool.
+
+POPULATION = 500
+HIDDEN = 8
+INPUTS = 6  # Height, velocity, distance to the next pipe, gap top and bottom, bias
+MAX_FRAMES = 5000  # Frames before a generation is stopped
+ELITE = 0.1  # Share of each generation kept as parents
+MUTATION = 0.2
+PIPE_BONUS = 100  # Fitness per pipe passed, on top of one per frame survived
+
+
+def new_population(rng, size=POPULATION):
+    return (rng.normal(0, 1, (size, INPUTS, HIDDEN)),
+            rng.normal(0, 1, (size, HIDDEN)))
+
+
+def decide(weights, y, velocity, pipe):
+    """Return the flap decision of every bird from one batched forward pass."""
+    w1, w2 = weights
+    x, height = pipe if pipe else (WIDTH, (HEIGHT - PIPE_GAP) // 2)
+    inputs = np.empty((len(y), 1, INPUTS))
+    inputs[:, 0, 0] = y / HEIGHT
+    inputs[:, 0, 1] = velocity / JUMP_STRENGTH
+    inputs[:, 0, 2] = (x - BIRD_X) / WIDTH
+    inputs[:, 0, 3] = (height - y) / HEIGHT
+    inputs[:, 0, 4] = (height + PIPE_GAP - y - BIRD_SIZE) / HEIGHT
+    inputs[:, 0, 5] = 1.0
+    hidden = np.tanh(np.matmul(inputs, w1)[:, 0])
+    return np.einsum('ph,ph->p', hidden, w2) > 0
+
+
+def evaluate(weights, seed, max_frames=MAX_FRAMES):
+    """Fly every bird through the pipe stream of seed. Returns each bird's (fitness, pipes passed)."""
+    size = len(weights[0])
+    stream = FlappyBird(seed)
+    y = np.full(size, float(stream.bird_y))
+    velocity = np.zeros(size)
+    alive = np.ones(size, dtype=bool)
+    frames = np.zeros(size)
+    pipes = np.zeros(size, dtype=np.int64)
+    for _ in range(max_frames):
+        velocity[decide(weights, y, velocity, stream.next_pipe()) & alive] = -JUMP_STRENGTH
+        velocity[alive] += GRAVITY
+        # Whole pixels, rounded like FlappyBird.update
+        moved = y + velocity
+        y[alive] = np.trunc(moved + np.copysign(0.5, moved))[alive]
+        passed = stream.advance_pipes()
+        stream.frames += 1
+
+        dead = (y < 0) | (y + BIRD_SIZE > HEIGHT)
+        for height in stream.pipes_at_bird():
+            dead |= (y < height) | (y + BIRD_SIZE > height + PIPE_GAP)
+        frames[alive] += 1
+        pipes[alive] += passed
+        alive &= ~dead
+        if not alive.any():
+            break
+    return frames + pipes * PIPE_BONUS, pipes
+
+
+def next_generation(weights, fitness, rng):
+    """Keep the fittest birds and refill the population with mutated copies."""
+    size = len(fitness)
+    order = np.argsort(fitness)[::-1]
+    elite = order[:max(int(size * ELITE), 1)]
+    parents = np.concatenate([elite, rng.choice(elite, size - len(elite))])
+    w1, w2 = weights[0][parents], weights[1][parents]
+    w1[len(elite):] += rng.normal(0, MUTATION, w1[len(elite):].shape)
+    w2[len(elite):] += rng.normal(0, MUTATION, w2[len(elite):].shape)
+    return w1, w2
+
+
+def evolve(args):
+    """Evolve one species. Returns (best fitness per generation, most pipes passed)."""
+    seed, generations, size = args
+    rng = np.random.default_rng(seed)
+    weights = new_population(rng, size)
+    history = []
+    best_pipes = 0
+    for generation in range(generations):
+        # A new pipe stream every generation, so birds cannot memorise one
+        fitness, pipes = evaluate(weights, seed * 1000003 + generation)
+        history.append(float(fitness.max()))
+        best_pipes = max(best_pipes, int(pipes.max()))
+        weights = next_generation(weights, fitness, rng)
+    return history, best_pipes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evolve Flappy Bird agents')
+    parser.add_argument('--species', type=int, default=4, help='independent populations, one per task')
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--population', type=int, default=POPULATION)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tasks = [(args.seed + i, args.generations, args.population) for i in range(args.species)]
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        results = pool.map(evolve, tasks)
+    elapsed = time.perf_counter() - start
+    for (seed, _, _), (history, pipes) in zip(tasks, results):
+        print(f"species {seed}: best fitness {history[0]:.0f} -> {history[-1]:.0f}, up to {pipes} pipes")
+    generations = args.species * args.generations
+    print(f"{generations} generations of {args.population} birds in {elapsed:.1f}s "
+          f"= {generations / elapsed:.2f} generations/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
+import numpy as np
 import pygame
 import random
 import time
 
-# Initialize Pygame
-pygame.init()
+import textcache
 
 # Constants
 WIDTH, HEIGHT = 400, 400
@@ -20,126 +20,153 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 
 # Font
-pygame.font.init()
-FONT = pygame.font.SysFont('Arial', 24)
+FONT = ('Arial', 24)
 
 # Game Variables
 game_over = False
 game_start_time = 0
 
-# Tile Class
-class Tile:
-    def __init__(self):
-        self.is_mine = False
-        self.is_revealed = False
-        self.is_flagged = False
-        self.adjacent_mines = 0
+# Offsets of the eight neighbours of a cell
+NEIGHBOURS = [(dr, dc) for dr in [-1, 0, 1] for dc in [-1, 0, 1] if dr or dc]
 
-    def reveal(self):
-        self.is_revealed = True
+def count_adjacent(padded_mines):
+    """Count adjacent mines for the interior of a mine array with a one-cell border.
 
-    def flag(self):
-        self.is_flagged = not self.is_flagged
+    Sums the array shifted towards each neighbour in one pass. Mines
+    themselves get a count of 0.
+    """
+    mines = padded_mines.astype(np.int8)
+    rows, cols = mines.shape[0] - 2, mines.shape[1] - 2
+    counts = np.zeros((rows, cols), dtype=np.int8)
+    for dr, dc in NEIGHBOURS:
+        counts += mines[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+    counts[padded_mines[1:-1, 1:-1]] = 0
+    return counts
 
 # Minesweeper Class
 class Minesweeper:
-    def __init__(self):
-        self.board = [[Tile() for _ in range(COLS)] for _ in range(ROWS)]
-        self.place_mines()
+    def __init__(self, rows=ROWS, cols=COLS, num_mines=NUM_MINES, seed=None, mines=None):
+        self.rows, self.cols, self.num_mines = rows, cols, num_mines
+        self.rng = random.Random(seed)
+        # The board is stored as one array per property, with a one-cell
+        # border so neighbour lookups never need bounds checks. The border is
+        # marked revealed so flood fills stop there.
+        shape = (rows + 2, cols + 2)
+        self._mines = np.zeros(shape, dtype=bool)
+        self._revealed = np.ones(shape, dtype=bool)
+        self._flagged = np.zeros(shape, dtype=bool)
+        self._counts = np.zeros(shape, dtype=np.int8)
+        self._revealed[1:-1, 1:-1] = False
+        self.mines = self._mines[1:-1, 1:-1]
+        self.revealed = self._revealed[1:-1, 1:-1]
+        self.flagged = self._flagged[1:-1, 1:-1]
+        self.counts = self._counts[1:-1, 1:-1]
+        # Flat index offsets of the neighbours in the padded arrays
+        self._offsets = np.array([dr * (cols + 2) + dc for dr, dc in NEIGHBOURS])
+        # A given layout is a list of flat cell indices (row * cols + col)
+        if mines is None:
+            self.place_mines()
+        else:
+            self.mines[np.unravel_index(np.asarray(mines, dtype=np.intp), (rows, cols))] = True
         self.calculate_adjacency()
 
     def place_mines(self):
-        mine_count = 0
-        while mine_count < NUM_MINES:
-            r = random.randint(0, ROWS - 1)
-            c = random.randint(0, COLS - 1)
-            if not self.board[r][c].is_mine:
-                self.board[r][c].is_mine = True
-                mine_count += 1
+        # Sampling without replacement stays fast at any mine density
+        cells = self.rng.sample(range(self.rows * self.cols), self.num_mines)
+        self.mines[np.unravel_index(np.asarray(cells, dtype=np.intp), (self.rows, self.cols))] = True
 
     def calculate_adjacency(self):
-        for r in range(ROWS):
-            for c in range(COLS):
-                if self.board[r][c].is_mine:
-                    continue
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        if 0 <= r + dr < ROWS and 0 <= c + dc < COLS:
-                            if self.board[r + dr][c + dc].is_mine:
-                                self.board[r][c].adjacent_mines += 1
+        self.counts[:] = count_adjacent(self._mines)
 
     def reveal_tile(self, r, c):
-        if self.board[r][c].is_revealed or self.board[r][c].is_flagged:
+        if self.revealed[r, c] or self.flagged[r, c]:
             return
 
-        self.board[r][c].reveal()
+        self.revealed[r, c] = True
 
-        if self.board[r][c].is_mine:
+        if self.mines[r, c]:
             global game_over
             game_over = True
             return
 
-        if self.board[r][c].adjacent_mines == 0:
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    if 0 <= r + dr < ROWS and 0 <= c + dc < COLS:
-                        self.reveal_tile(r + dr, c + dc)
+        if self.counts[r, c] == 0:
+            self.flood_fill(r, c)
+
+    def flood_fill(self, r, c):
+        """Reveal the empty region around (r, c) and its numbered border.
+
+        Works breadth first on whole frontiers at a time, so large regions
+        need neither recursion nor a Python step per cell.
+        """
+        revealed = self._revealed.ravel()
+        flagged = self._flagged.ravel()
+        counts = self._counts.ravel()
+        frontier = np.array([(r + 1) * (self.cols + 2) + c + 1])
+        while len(frontier):
+            neighbours = (frontier[:, None] + self._offsets).ravel()
+            neighbours = np.unique(neighbours[~revealed[neighbours] & ~flagged[neighbours]])
+            revealed[neighbours] = True
+            frontier = neighbours[counts[neighbours] == 0]
 
     def flag_tile(self, r, c):
-        self.board[r][c].flag()
+        self.flagged[r, c] = not self.flagged[r, c]
 
     def draw(self, screen):
-        for r in range(ROWS):
-            for c in range(COLS):
-                tile = self.board[r][c]
+        mines = self.mines.tolist()
+        revealed = self.revealed.tolist()
+        flagged = self.flagged.tolist()
+        counts = self.counts.tolist()
+        for r in range(self.rows):
+            for c in range(self.cols):
                 rect = pygame.Rect(c * TILE_SIZE, r * TILE_SIZE, TILE_SIZE, TILE_SIZE)
                 
-                if tile.is_revealed:
+                if revealed[r][c]:
                     color = WHITE
-                    if tile.is_mine:
+                    if mines[r][c]:
                         color = RED
                     pygame.draw.rect(screen, color, rect)
-                    if tile.adjacent_mines > 0 and not tile.is_mine:
-                        text = FONT.render(str(tile.adjacent_mines), True, BLACK)
+                    if counts[r][c] > 0:
+                        text = textcache.render(FONT, str(counts[r][c]), BLACK)
                         screen.blit(text, (c * TILE_SIZE + 10, r * TILE_SIZE + 5))
                 else:
                     pygame.draw.rect(screen, GRAY, rect)
-                    if tile.is_flagged:
+                    if flagged[r][c]:
                         pygame.draw.circle(screen, BLACK, rect.center, TILE_SIZE // 4)
 
                 pygame.draw.rect(screen, BLACK, rect, 1)
 
 # Function to reset the game
-def reset_game():
+def reset_game(new_board=Minesweeper):
     global game_over, game_start_time
     game_over = False
     game_start_time = time.time()
-    return Minesweeper()
+    return new_board()
 
-def main():
+def main(new_board=Minesweeper):
     global game_over, game_start_time
+    pygame.init()
     clock = pygame.time.Clock()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('Minesweeper')
-    minesweeper = reset_game()
+    minesweeper = reset_game(new_board)
 
     while True:
         screen.fill(WHITE)
         minesweeper.draw(screen)
 
         if game_over:
-            text = FONT.render("Game Over!", True, BLACK)
+            text = textcache.render(FONT, "Game Over!", BLACK)
             screen.blit(text, (WIDTH // 2 - 60, HEIGHT // 2 - 20))
             # Show time taken
             time_taken = int(time.time() - game_start_time)
-            time_text = FONT.render(f"Time: {time_taken} seconds", True, BLACK)
+            time_text = textcache.render(FONT, f"Time: {time_taken} seconds", BLACK)
             screen.blit(time_text, (WIDTH // 2 - 80, HEIGHT // 2 + 10))
-            restart_text = FONT.render("Press R to Restart", True, BLACK)
+            restart_text = textcache.render(FONT, "Press R to Restart", BLACK)
             screen.blit(restart_text, (WIDTH // 2 - 90, HEIGHT // 2 + 40))
         else:
             # Display elapsed time
             elapsed_time = int(time.time() - game_start_time)
-            timer_text = FONT.render(f"Time: {elapsed_time}", True, BLACK)
+            timer_text = textcache.render(FONT, f"Time: {elapsed_time}", BLACK)
             screen.blit(timer_text, (10, 10))
 
         for event in pygame.event.get():
@@ -156,7 +183,7 @@ def main():
                     minesweeper.flag_tile(row, col)
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r and game_over:  # Restart game
-                    minesweeper = reset_game()
+                    minesweeper = reset_game(new_board)
 
         pygame.display.flip()
         clock.tick(FPS)
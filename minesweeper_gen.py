@@ -0,0 +1,121 @@
+import argparse
+import random
+import time
+from collections import deque
+from multiprocessing import Pool
+
+import minesweeper
+from minesweeper import Minesweeper, ROWS, COLS, NUM_MINES, NEIGHBOURS
+from minesweeper_solver import Solver
+
+# No-guess board generation. Candidate layouts are sampled without
+# replacement around a safe first cell and kept only if the solver can clear
+# them from that cell using certain moves alone.
+
+MAX_ATTEMPTS = 200  # Candidates a worker tries before reporting back
+QUEUE_SIZE = 4  # Boards generated ahead of time
+
+
+def start_cell(rows, cols):
+    return rows // 2, cols // 2
+
+
+def sample_mines(rows, cols, num_mines, first, rng):
+    """Sample mine cells, keeping the first cell (and its neighbours if possible) clear."""
+    r, c = first
+    excluded = {r * cols + c}
+    around = {(r + dr) * cols + c + dc for dr, dc in NEIGHBOURS if 0 <= r + dr < rows and 0 <= c + dc < cols}
+    # Clearing the neighbours too makes the first click open an area
+    if rows * cols - len(excluded) - len(around) >= num_mines:
+        excluded |= around
+    return rng.sample([i for i in range(rows * cols) if i not in excluded], num_mines)
+
+
+def is_no_guess(game, first):
+    """Return True if the board can be cleared from the first cell without guessing."""
+    solver = Solver(game)
+    game.reveal_tile(*first)
+    while not solver.won():
+        safe, _ = solver.analyse()
+        if not safe:
+            return False
+        for r, c in safe:
+            game.reveal_tile(r, c)
+    return True
+
+
+def find_board(args):
+    """Try candidates until one is no-guess. Returns (mines or None, attempts)."""
+    rows, cols, num_mines, seed, attempts = args
+    rng = random.Random(seed)
+    first = start_cell(rows, cols)
+    for attempt in range(attempts):
+        mines = sample_mines(rows, cols, num_mines, first, rng)
+        if is_no_guess(Minesweeper(rows, cols, num_mines, mines=mines), first):
+            return mines, attempt + 1
+    return None, attempts
+
+
+# Keeps a few boards being generated on a process pool so a new game can
+# start without waiting. Every board is opened at its safe start cell, since
+# the layout has to exist before the player clicks.
+class BoardQueue:
+    def __init__(self, rows=ROWS, cols=COLS, num_mines=NUM_MINES, size=QUEUE_SIZE, workers=None, seed=None):
+        self.rows, self.cols, self.num_mines = rows, cols, num_mines
+        self.pool = Pool(workers)
+        self.seeds = random.Random(seed)
+        self.pending = deque()
+        self.attempts = 0
+        for _ in range(size):
+            self.submit()
+
+    def submit(self):
+        args = (self.rows, self.cols, self.num_mines, self.seeds.getrandbits(64), MAX_ATTEMPTS)
+        self.pending.append(self.pool.apply_async(find_board, (args,)))
+
+    def get(self):
+        """Return the next no-guess board, with its start cell revealed."""
+        while True:
+            mines, attempts = self.pending.popleft().get()
+            self.attempts += attempts
+            self.submit()
+            if mines is not None:
+                game = Minesweeper(self.rows, self.cols, self.num_mines, mines=mines)
+                game.reveal_tile(*start_cell(self.rows, self.cols))
+                return game
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='No-guess Minesweeper boards')
+    parser.add_argument('--bench', type=int, metavar='N', help='generate N boards and report the rate')
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--cols', type=int, default=COLS)
+    parser.add_argument('--mines', type=int, default=NUM_MINES)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    # The pool has to start before minesweeper.main initializes pygame
+    with BoardQueue(args.rows, args.cols, args.mines, workers=args.workers) as queue:
+        if not args.bench:
+            minesweeper.main(queue.get)
+            return
+        start = time.perf_counter()
+        for _ in range(args.bench):
+            queue.get()
+        elapsed = time.perf_counter() - start
+        print(f"{args.bench} no-guess {args.rows}x{args.cols} boards with {args.mines} mines in {elapsed:.1f}s "
+              f"({args.bench / elapsed:.1f} boards/s, {queue.attempts} candidates checked)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import mmap
+import os
+import random
+import struct
+from collections import OrderedDict, deque
+
+import numpy as np
+import pygame
+
+import textcache
+from minesweeper import WIDTH, HEIGHT, TILE_SIZE, FPS, WHITE, GRAY, BLACK, RED, FONT, NEIGHBOURS, count_adjacent
+
+# Endless Minesweeper. The world is split into CHUNK_SIZE x CHUNK_SIZE chunks
+# whose mines are generated on first access from a seed derived from the
+# chunk coordinates, so only the player's marks need storing. Those live in
+# a memory-mapped file, and only a bounded number of chunks stay decoded.
+
+CHUNK_SIZE = 32
+DENSITY = 0.15
+CACHE_CHUNKS = 64
+STATE_FILE = 'minesweeper_world.dat'
+SCROLL_SPEED = 1  # Cells per frame while an arrow key is held
+
+# Per-cell state bits kept in the file
+REVEALED = 1
+FLAGGED = 2
+
+# File layout: header, then slots of (chunk x, chunk y, one byte per cell)
+HEADER = struct.Struct('<4sIqQ')
+MAGIC = b'MSW1'
+SLOT_KEY = struct.Struct('<ii')
+
+
+def chunk_mines(seed, cx, cy, density=DENSITY):
+    """Generate the mines of one chunk. The same inputs always give the same mines."""
+    rng = np.random.default_rng([seed, cx & 0xFFFFFFFF, cy & 0xFFFFFFFF])
+    return rng.random((CHUNK_SIZE, CHUNK_SIZE)) < density
+
+
+# Slots of chunk state in a memory-mapped file, grown as new chunks are saved
+class ChunkStore:
+    def __init__(self, path, seed=None):
+        self.path = path
+        self.slot_size = SLOT_KEY.size + CHUNK_SIZE * CHUNK_SIZE
+        self.index = {}  # (cx, cy) -> slot number
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        self.file = open(path, 'r+b' if exists else 'w+b')
+        if exists:
+            magic, chunk_size, self.seed, self.used = HEADER.unpack(self.file.read(HEADER.size))
+            if magic != MAGIC or chunk_size != CHUNK_SIZE or (seed is not None and seed != self.seed):
+                exists = False
+        if not exists:
+            self.seed = random.getrandbits(62) if seed is None else seed
+            self.file.truncate(0)
+            self.used = 0
+            self.file.write(HEADER.pack(MAGIC, CHUNK_SIZE, self.seed, self.used))
+            self.file.truncate(HEADER.size + 16 * self.slot_size)
+        self.file.flush()
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.slots = (len(self.map) - HEADER.size) // self.slot_size
+        for slot in range(self.used):
+            self.index[SLOT_KEY.unpack_from(self.map, self.offset(slot))] = slot
+
+    def offset(self, slot):
+        return HEADER.size + slot * self.slot_size
+
+    def load(self, cx, cy):
+        slot = self.index.get((cx, cy))
+        if slot is None:
+            return np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+        start = self.offset(slot) + SLOT_KEY.size
+        return np.frombuffer(self.map[start:start + CHUNK_SIZE * CHUNK_SIZE], dtype=np.uint8).reshape(CHUNK_SIZE, CHUNK_SIZE).copy()
+
+    def save(self, cx, cy, state):
+        slot = self.index.get((cx, cy))
+        if slot is None:
+            if self.used == self.slots:
+                self.grow()
+            slot = self.index[(cx, cy)] = self.used
+            self.used += 1
+            SLOT_KEY.pack_into(self.map, self.offset(slot), cx, cy)
+            HEADER.pack_into(self.map, 0, MAGIC, CHUNK_SIZE, self.seed, self.used)
+        start = self.offset(slot) + SLOT_KEY.size
+        self.map[start:start + CHUNK_SIZE * CHUNK_SIZE] = state.tobytes()
+
+    def grow(self):
+        self.slots *= 2
+        self.map.close()
+        self.file.truncate(self.offset(self.slots))
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+# One decoded chunk
+class Chunk:
+    def __init__(self, mines, counts, state):
+        self.mines = mines
+        self.counts = counts
+        self.state = state
+        self.dirty = False
+
+
+# Endless board in world cell coordinates (rows grow down, cols grow right)
+class World:
+    def __init__(self, path=STATE_FILE, seed=None, density=DENSITY, cache_chunks=CACHE_CHUNKS):
+        self.store = ChunkStore(path, seed)
+        self.seed = self.store.seed
+        self.density = density
+        self.cache_chunks = cache_chunks
+        self.chunks = OrderedDict()
+        self.game_over = False
+
+    def chunk(self, cx, cy):
+        chunk = self.chunks.get((cx, cy))
+        if chunk is not None:
+            self.chunks.move_to_end((cx, cy))
+            return chunk
+        # Counts along the edges need the neighbouring chunks' mines, which
+        # are cheap to regenerate
+        mosaic = np.block([[chunk_mines(self.seed, cx + dx, cy + dy, self.density) for dx in (-1, 0, 1)]
+                           for dy in (-1, 0, 1)])
+        padded = mosaic[CHUNK_SIZE - 1:2 * CHUNK_SIZE + 1, CHUNK_SIZE - 1:2 * CHUNK_SIZE + 1]
+        chunk = Chunk(padded[1:-1, 1:-1].copy(), count_adjacent(padded), self.store.load(cx, cy))
+        self.chunks[(cx, cy)] = chunk
+        if len(self.chunks) > self.cache_chunks:
+            (old_cx, old_cy), old = self.chunks.popitem(last=False)
+            if old.dirty:
+                self.store.save(old_cx, old_cy, old.state)
+        return chunk
+
+    def cell(self, r, c):
+        """Return (chunk, row, col) for a world cell."""
+        cy, row = divmod(r, CHUNK_SIZE)
+        cx, col = divmod(c, CHUNK_SIZE)
+        return self.chunk(cx, cy), row, col
+
+    def reveal_tile(self, r, c):
+        chunk, row, col = self.cell(r, c)
+        if chunk.state[row, col]:
+            return
+        if chunk.mines[row, col]:
+            chunk.state[row, col] = REVEALED
+            chunk.dirty = True
+            self.game_over = True
+            return
+
+        # Iterative flood fill that crosses chunk borders
+        queue = deque([(r, c)])
+        while queue:
+            r, c = queue.popleft()
+            chunk, row, col = self.cell(r, c)
+            if chunk.state[row, col]:
+                continue
+            chunk.state[row, col] = REVEALED
+            chunk.dirty = True
+            if chunk.counts[row, col] == 0:
+                for dr, dc in NEIGHBOURS:
+                    queue.append((r + dr, c + dc))
+
+    def flag_tile(self, r, c):
+        chunk, row, col = self.cell(r, c)
+        if not chunk.state[row, col] & REVEALED:
+            chunk.state[row, col] ^= FLAGGED
+            chunk.dirty = True
+
+    def save(self):
+        for (cx, cy), chunk in self.chunks.items():
+            if chunk.dirty:
+                self.store.save(cx, cy, chunk.state)
+                chunk.dirty = False
+
+    def close(self):
+        self.save()
+        self.store.close()
+
+    def draw(self, screen, top, left):
+        """Draw the cells in view, with world cell (top, left) in the corner."""
+        rows = HEIGHT // TILE_SIZE + 1
+        cols = WIDTH // TILE_SIZE + 1
+        # Only the chunks overlapping the viewport are touched
+        for cy in range(top // CHUNK_SIZE, (top + rows) // CHUNK_SIZE + 1):
+            for cx in range(left // CHUNK_SIZE, (left + cols) // CHUNK_SIZE + 1):
+                chunk = self.chunk(cx, cy)
+                r0 = max(top, cy * CHUNK_SIZE)
+                r1 = min(top + rows, (cy + 1) * CHUNK_SIZE)
+                c0 = max(left, cx * CHUNK_SIZE)
+                c1 = min(left + cols, (cx + 1) * CHUNK_SIZE)
+                for r in range(r0, r1):
+                    for c in range(c0, c1):
+                        row, col = r - cy * CHUNK_SIZE, c - cx * CHUNK_SIZE
+                        state = chunk.state[row, col]
+                        rect = pygame.Rect((c - left) * TILE_SIZE, (r - top) * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                        if state & REVEALED:
+                            pygame.draw.rect(screen, RED if chunk.mines[row, col] else WHITE, rect)
+                            count = chunk.counts[row, col]
+                            if count > 0:
+                                screen.blit(textcache.render(FONT, str(count), BLACK), (rect.x + 10, rect.y + 5))
+                        else:
+                            pygame.draw.rect(screen, GRAY, rect)
+                            if state & FLAGGED:
+                                pygame.draw.circle(screen, BLACK, rect.center, TILE_SIZE // 4)
+                        pygame.draw.rect(screen, BLACK, rect, 1)
+
+
+def main():
+    pygame.init()
+    clock = pygame.time.Clock()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Minesweeper (endless)')
+    world = World()
+    top, left = 0, 0
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                world.close()
+                pygame.quit()
+                return
+            if event.type == pygame.MOUSEBUTTONDOWN and not world.game_over:
+                x, y = event.pos
+                row = top + y // TILE_SIZE
+                col = left + x // TILE_SIZE
+                if event.button == 1:  # Left click
+                    world.reveal_tile(row, col)
+                elif event.button == 3:  # Right click
+                    world.flag_tile(row, col)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r and world.game_over:
+                # Restart in a fresh world
+                world.store.close()
+                os.remove(STATE_FILE)
+                world = World()
+                top, left = 0, 0
+
+        keys = pygame.key.get_pressed()
+        top += (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * SCROLL_SPEED
+        left += (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * SCROLL_SPEED
+
+        screen.fill(WHITE)
+        world.draw(screen, top, left)
+        if world.game_over:
+            screen.blit(textcache.render(FONT, "Game Over! Press R to Restart", BLACK), (WIDTH // 2 - 150, HEIGHT // 2))
+        pygame.display.flip()
+        clock.tick(FPS)
+
+
+if __name__ == "__main__":
+    main()
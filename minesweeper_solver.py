@@ -0,0 +1,273 @@
+import argparse
+import time
+from collections import defaultdict
+from math import comb
+from multiprocessing import Pool
+
+import numpy as np
+
+from minesweeper import Minesweeper, NEIGHBOURS
+
+# Largest frontier component that is enumerated exactly. Bigger ones are
+# rare and fall back to the average density of the unknown cells.
+MAX_COMPONENT = 48
+
+
+def enumerate_component(cells, constraints):
+    """Count the mine layouts of one frontier component.
+
+    Returns {mines: (layouts, per-cell mine counts)} for every number of
+    mines the component can hold.
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    remaining = [mines for _, mines in constraints]
+    unassigned = [len(group) for group, _ in constraints]
+    cell_constraints = [[] for _ in cells]
+    for c, (group, _) in enumerate(constraints):
+        for cell in group:
+            cell_constraints[index[cell]].append(c)
+
+    results = {}
+    assignment = [0] * len(cells)
+
+    def backtrack(i, mines):
+        if i == len(cells):
+            layouts, cell_counts = results.get(mines, (0, [0] * len(cells)))
+            for j, value in enumerate(assignment):
+                cell_counts[j] += value
+            results[mines] = (layouts + 1, cell_counts)
+            return
+        for value in (0, 1):
+            ok = True
+            for c in cell_constraints[i]:
+                remaining[c] -= value
+                unassigned[c] -= 1
+                if remaining[c] < 0 or remaining[c] > unassigned[c]:
+                    ok = False
+            if ok:
+                assignment[i] = value
+                backtrack(i + 1, mines + value)
+            for c in cell_constraints[i]:
+                remaining[c] += value
+                unassigned[c] += 1
+        assignment[i] = 0
+
+    backtrack(0, 0)
+    return results
+
+
+def convolve(a, b):
+    result = defaultdict(int)
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j] += x * y
+    return result
+
+
+# Solver that only looks at what the player can see: revealed cells, their
+# numbers and the total number of mines
+class Solver:
+    def __init__(self, game):
+        self.game = game
+        self.mines = set()  # Cells known to be mines
+        self.cache = {}  # Component constraints -> enumeration
+        self.cache_hits = 0
+
+    def neighbours(self, r, c):
+        for dr, dc in NEIGHBOURS:
+            if 0 <= r + dr < self.game.rows and 0 <= c + dc < self.game.cols:
+                yield r + dr, c + dc
+
+    def constraints(self):
+        """Return {frozenset(unknown neighbours): mines among them}."""
+        revealed = self.game.revealed
+        constraints = {}
+        for r, c in np.argwhere(revealed & (self.game.counts > 0)).tolist():
+            unknown = []
+            mines = self.game.counts[r, c]
+            for cell in self.neighbours(r, c):
+                if cell in self.mines:
+                    mines -= 1
+                elif not revealed[cell]:
+                    unknown.append(cell)
+            if unknown:
+                constraints[frozenset(unknown)] = int(mines)
+        return constraints
+
+    def propagate(self, constraints):
+        """Find certain cells with the single-constraint and subset rules.
+
+        Returns the safe cells; new mines are added to self.mines and the
+        constraints are reduced in place.
+        """
+        safe = set()
+        changed = True
+        while changed:
+            changed = False
+            known = set()
+            for group, mines in list(constraints.items()):
+                if mines == 0:
+                    safe |= group
+                    known |= group
+                elif mines == len(group):
+                    self.mines |= group
+                    known |= group
+            groups = sorted(constraints, key=len)
+            for i, small in enumerate(groups):
+                for big in groups[i + 1:]:
+                    if small < big and small in constraints and big in constraints:
+                        rest = big - small
+                        mines = constraints[big] - constraints[small]
+                        if rest not in constraints:
+                            constraints[rest] = mines
+                            changed = True
+            if known:
+                changed = True
+                reduced = {}
+                for group, mines in constraints.items():
+                    mines -= len(group & self.mines)
+                    group = group - known
+                    if group:
+                        reduced[group] = mines
+                constraints.clear()
+                constraints.update(reduced)
+        return safe
+
+    def components(self, constraints):
+        """Split the frontier into groups of cells linked by constraints."""
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for group in constraints:
+            cells = list(group)
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            for cell in cells[1:]:
+                parent[find(cell)] = find(cells[0])
+        components = defaultdict(lambda: ([], []))
+        for cell in parent:
+            components[find(cell)][0].append(cell)
+        for group, mines in constraints.items():
+            components[find(next(iter(group)))][1].append((group, mines))
+        return list(components.values())
+
+    def enumerate(self, cells, constraints):
+        key = frozenset(constraints)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.cache[key] = enumerate_component(sorted(cells), constraints)
+        else:
+            self.cache_hits += 1
+        return sorted(cells), result
+
+    def analyse(self):
+        """Return (safe cells, probability of a mine for every unknown cell)."""
+        constraints = self.constraints()
+        safe = self.propagate(constraints)
+        unknown = {tuple(cell) for cell in np.argwhere(~self.game.revealed).tolist()} - self.mines - safe
+        mines_left = self.game.num_mines - len(self.mines)
+
+        solved = []
+        frontier = set()
+        for cells, component in self.components(constraints):
+            if len(cells) <= MAX_COMPONENT:
+                solved.append(self.enumerate(cells, component))
+                frontier |= set(cells)
+        others = len(unknown - frontier)
+
+        # Weigh each component's layouts by the number of ways to place the
+        # remaining mines in the cells no constraint touches
+        polynomials = [{k: layouts for k, (layouts, _) in result.items()} for _, result in solved]
+        total = defaultdict(int, {0: 1})
+        for polynomial in polynomials:
+            total = convolve(total, polynomial)
+        weight = sum(ways * comb(others, mines_left - k) for k, ways in total.items() if 0 <= mines_left - k)
+
+        probabilities = {}
+        if weight:
+            for i, (cells, result) in enumerate(solved):
+                rest = defaultdict(int, {0: 1})
+                for j, polynomial in enumerate(polynomials):
+                    if j != i:
+                        rest = convolve(rest, polynomial)
+                cell_weights = [0] * len(cells)
+                for k, (_, cell_counts) in result.items():
+                    outside = sum(ways * comb(others, mines_left - k - m)
+                                  for m, ways in rest.items() if 0 <= mines_left - k - m)
+                    for j, count in enumerate(cell_counts):
+                        cell_weights[j] += count * outside
+                for cell, cell_weight in zip(cells, cell_weights):
+                    probabilities[cell] = cell_weight / weight
+            if others:
+                expected = sum(ways * comb(others, mines_left - k) * (mines_left - k)
+                               for k, ways in total.items() if 0 <= mines_left - k)
+                density = expected / weight / others
+                for cell in unknown - frontier:
+                    probabilities[cell] = density
+        else:
+            for cell in unknown:
+                probabilities[cell] = mines_left / max(len(unknown), 1)
+
+        for cell, probability in probabilities.items():
+            if probability == 0:
+                safe.add(cell)
+            elif probability == 1:
+                self.mines.add(cell)
+        return safe, probabilities
+
+    def next_moves(self):
+        """Cells to reveal next: every certain-safe cell, or else the best guess."""
+        safe, probabilities = self.analyse()
+        if safe:
+            return sorted(safe)
+        guesses = [cell for cell in probabilities if cell not in self.mines]
+        if not guesses:
+            return []
+        # Among equal risks prefer cells with fewer neighbours, like corners
+        return [min(guesses, key=lambda cell: (probabilities[cell], len(list(self.neighbours(*cell)))))]
+
+    def won(self):
+        return self.game.revealed.sum() == self.game.rows * self.game.cols - self.game.num_mines
+
+    def play(self):
+        """Play the game to the end. Returns True if it was won."""
+        while not self.won():
+            moves = self.next_moves()
+            if not moves:
+                return False
+            for r, c in moves:
+                self.game.reveal_tile(r, c)
+                if self.game.mines[r, c]:
+                    return False
+        return True
+
+
+def play_seeded(args):
+    seed, rows, cols, mines = args
+    return Solver(Minesweeper(rows, cols, mines, seed=seed)).play()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the Minesweeper solver win rate')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=16)
+    parser.add_argument('--cols', type=int, default=16)
+    parser.add_argument('--mines', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        results = pool.map(play_seeded, [(seed, args.rows, args.cols, args.mines) for seed in range(args.games)])
+    elapsed = time.perf_counter() - start
+    print(f"{args.rows}x{args.cols} with {args.mines} mines: won {sum(results)}/{args.games} "
+          f"({sum(results) / args.games:.1%}) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import importlib
+import random
+import time
+
+# A 4x4 2048 board packed into one 64-bit int. Each cell is a 4-bit exponent
+# (0 = empty, 1 = 2, 2 = 4, ...). Row r uses bits 16r..16r+15 and column c is
+# the nibble at 4c inside its row, so a left move is a lookup per row.
+# A nibble holds at most 32768, so two 32768 tiles do not merge here, where
+# Game would make 65536; the packed board stops there.
+
+GRID_SIZE = 4
+ROW_MASK = 0xFFFF
+MAX_EXPONENT = 15  # 32768, the largest tile a nibble holds
+DIRECTIONS = ('left', 'right', 'up', 'down')
+
+
+def unpack_row(row):
+    return [(row >> (4 * c)) & 0xF for c in range(GRID_SIZE)]
+
+
+def pack_row(cells):
+    row = 0
+    for c, value in enumerate(cells):
+        row |= value << (4 * c)
+    return row
+
+
+def reverse_row(row):
+    return pack_row(unpack_row(row)[::-1])
+
+
+def slide_left(cells):
+    """Slide one row of exponents left like Game.move. Returns (cells, score)."""
+    tiles = [value for value in cells if value]
+    result = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            result.append(tiles[i] + 1)
+            score += 1 << (tiles[i] + 1)
+            i += 2
+        else:
+            result.append(tiles[i])
+            i += 1
+    return result + [0] * (GRID_SIZE - len(result)), score
+
+
+# Move tables for every possible row, built once at import
+ROW_LEFT = [0] * 65536
+ROW_RIGHT = [0] * 65536
+ROW_LEFT_SCORE = [0] * 65536
+ROW_RIGHT_SCORE = [0] * 65536
+for row in range(65536):
+    cells, score = slide_left(unpack_row(row))
+    ROW_LEFT[row] = pack_row(cells)
+    ROW_LEFT_SCORE[row] = score
+for row in range(65536):
+    reversed_row = reverse_row(row)
+    ROW_RIGHT[row] = reverse_row(ROW_LEFT[reversed_row])
+    ROW_RIGHT_SCORE[row] = ROW_LEFT_SCORE[reversed_row]
+
+
+def transpose(board):
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def move_rows(board, table, scores):
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = board >> 48
+    new_board = table[r0] | (table[r1] << 16) | (table[r2] << 32) | (table[r3] << 48)
+    return new_board, scores[r0] + scores[r1] + scores[r2] + scores[r3]
+
+
+def move(board, direction):
+    """Apply a move to a packed board. Returns (new board, score gained, changed)."""
+    if direction == 'left':
+        new_board, score = move_rows(board, ROW_LEFT, ROW_LEFT_SCORE)
+    elif direction == 'right':
+        new_board, score = move_rows(board, ROW_RIGHT, ROW_RIGHT_SCORE)
+    elif direction == 'up':
+        new_board, score = move_rows(transpose(board), ROW_LEFT, ROW_LEFT_SCORE)
+        new_board = transpose(new_board)
+    elif direction == 'down':
+        new_board, score = move_rows(transpose(board), ROW_RIGHT, ROW_RIGHT_SCORE)
+        new_board = transpose(new_board)
+    else:
+        raise ValueError(f"unknown direction: {direction}")
+    return new_board, score, new_board != board
+
+
+def empty_cells(board):
+    return [i for i in range(GRID_SIZE * GRID_SIZE) if not (board >> (4 * i)) & 0xF]
+
+
+def from_grid(grid):
+    """Pack a list-of-lists grid of tile values (as used by Game)."""
+    board = 0
+    for r in range(GRID_SIZE):
+        for c in range(GRID_SIZE):
+            value = grid[r][c]
+            if value:
+                board |= (value.bit_length() - 1) << (4 * (GRID_SIZE * r + c))
+    return board
+
+
+def to_grid(board):
+    grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
+    for r in range(GRID_SIZE):
+        for c in range(GRID_SIZE):
+            exponent = (board >> (4 * (GRID_SIZE * r + c))) & 0xF
+            grid[r][c] = 1 << exponent if exponent else 0
+    return grid
+
+
+# Drop-in alternative to Game that keeps its grid packed
+class PackedGame:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.board = 0
+        self.score = 0
+        self.add_tile()
+        self.add_tile()
+
+    @property
+    def grid(self):
+        return to_grid(self.board)
+
+    def add_tile(self):
+        empty = empty_cells(self.board)
+        if empty:
+            i = self.rng.choice(empty)
+            self.board |= self.rng.choice([1, 2]) << (4 * i)
+
+    def move(self, direction):
+        """Move like Game.move. Returns (score gained, whether the grid changed)."""
+        self.board, score, changed = move(self.board, direction)
+        self.score += score
+        self.add_tile()
+        return score, changed
+
+
+def random_board(rng):
+    return from_grid([[rng.choice([0, 0, 2, 4, 8, 16, 32, 64]) for _ in range(GRID_SIZE)]
+                      for _ in range(GRID_SIZE)])
+
+
+def benchmark(game_module, moves=100000, seed=0):
+    rng = random.Random(seed)
+    boards = [random_board(rng) for _ in range(1000)]
+    directions = [rng.choice(DIRECTIONS) for _ in range(moves)]
+
+    game = game_module.Game()
+    game.add_tile = lambda: None
+    grids = [to_grid(board) for board in boards]
+    start = time.perf_counter()
+    for i, direction in enumerate(directions):
+        game.grid = grids[i % len(grids)]
+        game.move(direction)
+    list_rate = moves / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i, direction in enumerate(directions):
+        move(boards[i % len(boards)], direction)
+    packed_rate = moves / (time.perf_counter() - start)
+
+    print(f"Game.move: {list_rate:,.0f} moves/s")
+    print(f"packed move: {packed_rate:,.0f} moves/s ({packed_rate / list_rate:.1f}x)")
+
+
+def main():
+    # 2048.py can't be imported with a plain import statement
+    game_module = importlib.import_module('2048')
+    benchmark(game_module)
+
+
+if __name__ == "__main__":
+    main()
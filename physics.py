@@ -0,0 +1,153 @@
+import math
+
+import pygame
+
+# Shared physics for the ball games. Bodies move with continuous swept-AABB
+# collision, so a fast ball stops at the first surface on its path instead of
+# skipping over it, and the simulation advances in fixed steps independent of
+# the frame rate. Velocities are in pixels per step.
+
+STEP = 1 / 60  # Seconds of game time per simulation step
+MAX_STEPS = 10  # Steps per frame before the simulation gives up catching up
+MAX_HITS = 4  # Collisions resolved within one step
+
+
+def sweep(x, y, w, h, dx, dy, rect):
+    """Swept AABB test of a w x h box at (x, y) moving by (dx, dy) against rect.
+
+    Returns (t, nx, ny): the fraction of the move at first contact and the
+    surface normal, or None if the box does not reach rect within this move.
+    """
+    # Grow the target by the box size and cast the box's corner through it
+    left, top = rect.left - w, rect.top - h
+    right, bottom = rect.right, rect.bottom
+    if dx:
+        tx0, tx1 = (left - x) / dx, (right - x) / dx
+        if tx0 > tx1:
+            tx0, tx1 = tx1, tx0
+    elif left < x < right:
+        tx0, tx1 = -math.inf, math.inf
+    else:
+        return None
+    if dy:
+        ty0, ty1 = (top - y) / dy, (bottom - y) / dy
+        if ty0 > ty1:
+            ty0, ty1 = ty1, ty0
+    elif top < y < bottom:
+        ty0, ty1 = -math.inf, math.inf
+    else:
+        return None
+
+    entry = max(tx0, ty0)
+    if entry > min(tx1, ty1) or entry < 0 or entry >= 1:
+        return None
+    if tx0 > ty0:
+        return entry, -1 if dx > 0 else 1, 0
+    return entry, 0, -1 if dy > 0 else 1
+
+
+# A moving box with a float position. The previous position is kept so a
+# frame can be drawn between two simulation steps.
+class Body:
+    def __init__(self, x, y, w, h, dx=0.0, dy=0.0):
+        self.x = self.prev_x = float(x)
+        self.y = self.prev_y = float(y)
+        self.w = w
+        self.h = h
+        self.dx = dx
+        self.dy = dy
+
+    @property
+    def rect(self):
+        return pygame.Rect(round(self.x), round(self.y), self.w, self.h)
+
+    def teleport(self, x, y):
+        """Jump to (x, y) without interpolating from the old position."""
+        self.x = self.prev_x = float(x)
+        self.y = self.prev_y = float(y)
+
+    def interpolated(self, alpha):
+        """Return the rect alpha of the way from the previous step to the current one."""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return pygame.Rect(round(x), round(y), self.w, self.h)
+
+
+def move(body, obstacles, on_hit=None):
+    """Advance body by one step of its velocity, bouncing off obstacles.
+
+    obstacles(area) returns the objects (anything with a rect) that might lie
+    in the swept area. On contact the body stops there, its velocity is
+    reflected along the surface normal and on_hit(obj, nx, ny) is called,
+    which may change the velocity further. The rest of the step continues
+    from the contact point.
+    """
+    body.prev_x, body.prev_y = body.x, body.y
+    remaining = 1.0
+    for _ in range(MAX_HITS):
+        dx, dy = body.dx * remaining, body.dy * remaining
+        area = pygame.Rect(math.floor(min(body.x, body.x + dx)) - 1, math.floor(min(body.y, body.y + dy)) - 1,
+                           math.ceil(abs(dx)) + body.w + 2, math.ceil(abs(dy)) + body.h + 2)
+        first = None
+        for obj in obstacles(area):
+            hit = sweep(body.x, body.y, body.w, body.h, dx, dy, obj.rect)
+            if hit is not None and (first is None or hit[0] < first[0]):
+                first = hit + (obj,)
+        if first is None:
+            break
+        t, nx, ny, obj = first
+        body.x += dx * t
+        body.y += dy * t
+        if nx:
+            body.dx = abs(body.dx) * nx
+        if ny:
+            body.dy = abs(body.dy) * ny
+        if on_hit is not None:
+            on_hit(obj, nx, ny)
+        remaining *= 1 - t
+    else:
+        return
+    body.x += body.dx * remaining
+    body.y += body.dy * remaining
+
+
+# A fixed-size rectangle to bounce off, such as a wall
+class Solid:
+    def __init__(self, x, y, w, h):
+        self.rect = pygame.Rect(x, y, w, h)
+
+
+def walls(width, height, sides, thickness=100):
+    """Return Solids just outside a width x height field on the given sides."""
+    rects = {
+        'top': (-thickness, -thickness, width + 2 * thickness, thickness),
+        'bottom': (-thickness, height, width + 2 * thickness, thickness),
+        'left': (-thickness, -thickness, thickness, height + 2 * thickness),
+        'right': (width, -thickness, thickness, height + 2 * thickness),
+    }
+    return [Solid(*rects[side]) for side in sides]
+
+
+# Turns real frame times into a whole number of simulation steps. The
+# leftover time is the interpolation factor for drawing.
+class FixedStep:
+    def __init__(self, step=STEP, max_steps=MAX_STEPS):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        """Add elapsed seconds of real time and return the number of steps to run."""
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step + 1e-9)  # Tolerate rounding in summed frame times
+        if steps > self.max_steps:
+            # Too far behind: drop the backlog rather than spiral
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step
@@ -1,37 +1,44 @@
+import argparse
+import random
+import time
+
 import pygame
 
-# Initialize Pygame
-pygame.init()
+import physics
+import textcache
 
 # Constants
 WIDTH, HEIGHT = 800, 400
 FPS = 60
 BALL_SPEED = 5
+BALL_SIZE = 15
 PADDLE_SPEED = 10
 PADDLE_WIDTH, PADDLE_HEIGHT = 10, 100
 
+FONT = ('Arial', 24)
+
+# The ball bounces off the top and bottom; the sides are goals
+WALLS = physics.walls(WIDTH, HEIGHT, ('top', 'bottom'))
+
+# Computer player settings: steps before reacting to a new ball direction,
+# the largest aiming error in pixels, and paddle speed as a share of PADDLE_SPEED
+DIFFICULTIES = {
+    'easy': {'reaction': 20, 'error': 90, 'speed': 0.6},
+    'normal': {'reaction': 8, 'error': 60, 'speed': 0.8},
+    'hard': {'reaction': 2, 'error': 30, 'speed': 1.0},
+}
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
 # Ball Class
-class Ball:
+class Ball(physics.Body):
     def __init__(self):
-        self.rect = pygame.Rect(WIDTH // 2, HEIGHT // 2, 15, 15)
-        self.dx = BALL_SPEED
-        self.dy = BALL_SPEED
-
-    def move(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
-
-        # Bounce off the top and bottom
-        if self.rect.top <= 0 or self.rect.bottom >= HEIGHT:
-            self.dy = -self.dy
+        super().__init__(WIDTH // 2, HEIGHT // 2, BALL_SIZE, BALL_SIZE, BALL_SPEED, BALL_SPEED)
 
     def reset(self):
-        self.rect.x = WIDTH // 2
-        self.rect.y = HEIGHT // 2
+        self.teleport(WIDTH // 2, HEIGHT // 2)
         self.dx = BALL_SPEED * (-1 if self.dx > 0 else 1)
         self.dy = BALL_SPEED
 
@@ -47,34 +54,102 @@ class Paddle:
         if self.rect.bottom > HEIGHT:
             self.rect.bottom = HEIGHT
 
+def fold(y, low, high):
+    """Map an unbounded position onto [low, high] as if it bounced off both ends."""
+    span = high - low
+    if span <= 0:
+        return low
+    y = (y - low) % (2 * span)
+    return low + (y if y <= span else 2 * span - y)
+
+# Computer player. It predicts where the ball will meet its paddle, folding
+# the wall bounces in closed form, so it only needs to predict again when
+# the ball's velocity changes other than by a wall bounce (a paddle hit,
+# serve or reset) and each step costs the same however far the ball is.
+class PongAI:
+    def __init__(self, game, paddle, reaction=0, error=0, speed=1.0, seed=None):
+        self.game = game
+        self.paddle = paddle
+        self.reaction = reaction
+        self.error = error
+        self.max_speed = max(int(PADDLE_SPEED * speed), 1)
+        self.rng = random.Random(seed)
+        # Which way the ball travels towards this paddle, and where its left edge is at contact
+        self.facing = 1 if paddle.rect.centerx > WIDTH // 2 else -1
+        self.contact_x = paddle.rect.left - BALL_SIZE if self.facing > 0 else paddle.rect.right
+        self.velocity = None  # Ball velocity the target was predicted for
+        self.target = HEIGHT / 2
+        self.wait = 0
+        self.predictions = 0
+
+    def predict(self):
+        """Return the paddle centre to aim for."""
+        ball = self.game.ball
+        if ball.dx * self.facing <= 0:
+            return HEIGHT / 2  # Ball going away: wait in the middle
+        steps = max((self.contact_x - ball.x) / ball.dx, 0)
+        y = fold(ball.y + ball.dy * steps, 0, HEIGHT - ball.h)
+        return y + ball.h / 2 + self.rng.uniform(-self.error, self.error)
+
+    def bounced_off_wall(self):
+        """Check the last velocity change was only dy flipping at the top or bottom wall."""
+        ball = self.game.ball
+        return ((ball.dx, -ball.dy) == self.velocity and
+                (ball.y <= abs(ball.dy) or ball.y + ball.h >= HEIGHT - abs(ball.dy)))
+
+    def update(self):
+        ball = self.game.ball
+        # The prediction already allows for wall bounces, but a paddle's top
+        # or bottom edge flips dy too
+        if (ball.dx, ball.dy) != self.velocity:
+            if not self.bounced_off_wall():
+                self.target = self.predict()
+                self.wait = self.reaction
+                self.predictions += 1
+            self.velocity = (ball.dx, ball.dy)
+        if self.wait:
+            self.wait -= 1
+            return
+        # Move straight to the target instead of overshooting around it
+        distance = round(self.target - self.paddle.rect.centery)
+        self.paddle.move(max(-self.max_speed, min(self.max_speed, distance)))
+
 # Game Class
 class Game:
-    def __init__(self):
+    def __init__(self, ai1=None, ai2='normal', seed=None):
         self.ball = Ball()
         self.paddle1 = Paddle(10)
         self.paddle2 = Paddle(WIDTH - 20)
         self.score1 = 0
         self.score2 = 0
+        rng = random.Random(seed)
+        # Player 1 is the keyboard unless given a difficulty too
+        self.ai1 = PongAI(self, self.paddle1, seed=rng.random(), **DIFFICULTIES[ai1]) if ai1 else None
+        self.ai2 = PongAI(self, self.paddle2, seed=rng.random(), **DIFFICULTIES[ai2]) if ai2 else None
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         screen.fill(WHITE)
         pygame.draw.rect(screen, BLACK, self.paddle1.rect)
         pygame.draw.rect(screen, BLACK, self.paddle2.rect)
-        pygame.draw.ellipse(screen, BLACK, self.ball.rect)
+        pygame.draw.ellipse(screen, BLACK, self.ball.interpolated(alpha))
         self.display_score(screen)
 
     def display_score(self, screen):
-        font = pygame.font.SysFont('Arial', 24)
         score_text = f'{self.score1}  {self.score2}'
-        score_surface = font.render(score_text, True, BLACK)
+        score_surface = textcache.render(FONT, score_text, BLACK)
         screen.blit(score_surface, (WIDTH // 2 - score_surface.get_width() // 2, 10))
 
-    def update(self):
-        self.ball.move()
+    def obstacles(self, area):
+        return WALLS + [self.paddle1, self.paddle2]
 
-        # Ball collision with paddles
-        if self.ball.rect.colliderect(self.paddle1.rect) or self.ball.rect.colliderect(self.paddle2.rect):
+    def update(self):
+        # A paddle may have moved into the ball
+        if self.ball.dx < 0 and self.ball.rect.colliderect(self.paddle1.rect):
+            self.ball.dx = -self.ball.dx
+        if self.ball.dx > 0 and self.ball.rect.colliderect(self.paddle2.rect):
             self.ball.dx = -self.ball.dx
+        # The ball bounces off the walls and paddles along its whole path
+        physics.move(self.ball, self.obstacles)
 
         # Ball goes out of bounds
         if self.ball.rect.left <= 0:
@@ -84,17 +159,71 @@ class Game:
             self.score1 += 1
             self.ball.reset()
 
-        # AI for player 2
-        if self.ball.rect.centery < self.paddle2.rect.centery:
-            self.paddle2.move(-PADDLE_SPEED)
-        elif self.ball.rect.centery > self.paddle2.rect.centery + PADDLE_HEIGHT:
-            self.paddle2.move(PADDLE_SPEED)
+        # Computer players
+        if self.ai1 is not None:
+            self.ai1.update()
+        if self.ai2 is not None:
+            self.ai2.update()
+
+def state(game):
+    return game.score1, game.score2, game.ball.x, game.ball.y, game.paddle2.rect.y
+
+def benchmark(steps, seconds):
+    # Headless fast-forward
+    game = Game(seed=0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.update()
+    elapsed = time.perf_counter() - start
+    print(f"{steps} headless steps in {elapsed:.2f}s = {steps / elapsed:,.0f} steps/s, score {game.score1}-{game.score2}")
+
+    # Feeding the same game time through different frame rates gives the same game
+    results = {}
+    for fps in (30, 60, 144, 240):
+        game = Game(seed=0)
+        stepper = physics.FixedStep()
+        for _ in range(seconds * fps):
+            for _ in range(stepper.advance(1 / fps)):
+                game.update()
+        results[fps] = state(game)
+        print(f"{fps:3d} FPS for {seconds}s: score {game.score1}-{game.score2}, ball at ({game.ball.x:.1f}, {game.ball.y:.1f})")
+    assert len(set(results.values())) == 1
+
+def match(steps, ai1, ai2, seed=0):
+    """Play two computer players against each other headless."""
+    game = Game(ai1, ai2, seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.update()
+    elapsed = time.perf_counter() - start
+    print(f"{ai1} vs {ai2}: {game.score1}-{game.score2} after {steps} steps, {steps / elapsed:,.0f} steps/s, "
+          f"{game.ai1.predictions + game.ai2.predictions} predictions")
 
 def main():
+    parser = argparse.ArgumentParser(description='Pong')
+    parser.add_argument('--bench', action='store_true', help='fast-forward headless and compare frame rates')
+    parser.add_argument('--match', nargs=2, choices=DIFFICULTIES, metavar=('LEFT', 'RIGHT'),
+                        help='play two computer players headless')
+    parser.add_argument('--steps', type=int, default=100000)
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='normal', help='right-hand computer player')
+    parser.add_argument('--cpu', choices=DIFFICULTIES, help='let a computer player take the left paddle too')
+    parser.add_argument('--fps', type=int, default=FPS, help='frames drawn per second; the simulation rate is fixed')
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.steps, 60)
+        return
+    if args.match:
+        match(args.steps, *args.match)
+        return
+
+    pygame.init()
     clock = pygame.time.Clock()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('Pong Game with AI')
-    game = Game()
+    game = Game(args.cpu, args.difficulty)
+    # The simulation runs in fixed steps however fast frames are drawn
+    stepper = physics.FixedStep()
+    last = time.perf_counter()
 
     while True:
         for event in pygame.event.get():
@@ -102,17 +231,21 @@ def main():
                 pygame.quit()
                 return
 
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_w]:  # Move paddle 1 up
-            game.paddle1.move(-PADDLE_SPEED)
-        if keys[pygame.K_s]:  # Move paddle 1 down
-            game.paddle1.move(PADDLE_SPEED)
-
-        game.update()
-        game.draw(screen)
+        now = time.perf_counter()
+        steps = stepper.advance(now - last)
+        last = now
 
+        keys = pygame.key.get_pressed()
+        for _ in range(steps):
+            if keys[pygame.K_w]:  # Move paddle 1 up
+                game.paddle1.move(-PADDLE_SPEED)
+            if keys[pygame.K_s]:  # Move paddle 1 down
+                game.paddle1.move(PADDLE_SPEED)
+            game.update()
+
+        game.draw(screen, stepper.alpha)
         pygame.display.flip()
-        clock.tick(FPS)
+        clock.tick(args.fps)
 
 if __name__ == "__main__":
     main()
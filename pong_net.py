@@ -0,0 +1,465 @@
+import argparse
+import asyncio
+import random
+import struct
+import time
+import zlib
+
+import pygame
+
+import physics
+import pong
+from pong import PADDLE_SPEED
+
+# Two-player Pong over UDP. Both peers run the same deterministic simulation
+# and exchange only their paddle inputs (-1, 0 or 1 per tick). A missing
+# remote input is predicted as a repeat of the last confirmed one; when the
+# real input turns out different, the game is restored from the snapshot
+# taken before that tick and re-simulated (rollback). The host also sends
+# occasional snapshots, XOR-delta encoded against the last one the other peer
+# acknowledged and compressed, so the peers can detect and repair a desync.
+
+PORT = 5005
+MAX_ROLLBACK = 10  # Ticks a peer may run ahead of the remote inputs it has
+REDUNDANCY = 8  # Fewest recent inputs repeated in every packet, to ride out losses
+SYNC_INTERVAL = 30  # Ticks between host snapshots
+SYNC_RESEND = 4  # Ticks between resends of a snapshot until it is acknowledged
+HELLO_INTERVAL = 0.1  # Seconds between connection attempts
+TIMEOUT = 5.0  # Seconds without a packet before the other peer counts as gone
+LINGER = 60  # Ticks to keep resending at the end so the other peer can finish
+REACTION_TICKS = 6  # How often the scripted test players change their input
+
+# Network conditions for 'test --all': latency and jitter in seconds, loss
+TEST_CASES = [
+    (0.0, 0.0, 0.0),
+    (0.05, 0.02, 0.1),
+    (0.1, 0.03, 0.3),
+    (0.05, 0.02, 0.5),
+]
+
+# Packets
+HELLO = b'H'
+INPUT = struct.Struct('<cIiiB')  # b'I', first tick, confirmed tick, sync tick acknowledged, count, then inputs
+SYNC = struct.Struct('<cIi')  # b'S', tick, base tick (-1 for none), then the compressed delta
+STATE = struct.Struct('<ddddhhHH')  # Ball x, y, dx, dy, paddle tops, scores
+
+
+def snapshot(game):
+    ball = game.ball
+    return STATE.pack(ball.x, ball.y, ball.dx, ball.dy, game.paddle1.rect.y, game.paddle2.rect.y,
+                      game.score1, game.score2)
+
+
+def restore(game, data):
+    x, y, dx, dy, game.paddle1.rect.y, game.paddle2.rect.y, game.score1, game.score2 = STATE.unpack(data)
+    game.ball.teleport(x, y)
+    game.ball.dx, game.ball.dy = dx, dy
+
+
+def delta_encode(base, data):
+    """XOR data against base (zeros where unchanged) and compress the result."""
+    return zlib.compress(bytes(a ^ b for a, b in zip(base, data)), 9)
+
+
+def delta_decode(base, delta):
+    return bytes(a ^ b for a, b in zip(base, zlib.decompress(delta)))
+
+
+def simulate(game, input1, input2):
+    game.paddle1.move(input1 * PADDLE_SPEED)
+    game.paddle2.move(input2 * PADDLE_SPEED)
+    game.update()
+
+
+# One peer's view of the match. player is 0 for the left paddle (the host)
+# and 1 for the right. send(data) hands a packet to the transport.
+class Session:
+    def __init__(self, player, send):
+        self.player = player
+        self.send = send
+        self.game = pong.Game(ai2=None)
+        self.tick = 0  # Next tick to simulate
+        self.local = {}  # tick -> local input
+        self.remote = {}  # tick -> confirmed remote input
+        self.used = {}  # tick -> remote input the current state was simulated with
+        self.snapshots = {}  # tick -> state before simulating that tick
+        self.confirmed = -1  # Last tick up to which every remote input is known
+        self.remote_ack = -1  # Last tick up to which the remote has our inputs
+        self.sync_base = (-1, bytes(STATE.size))  # Last snapshot the client acknowledged
+        self.sync_sent = {}  # tick -> snapshot sent, awaiting acknowledgement
+        self.sync_sent_at = -SYNC_RESEND  # Tick the newest snapshot was last sent
+        self.sync_ack = -1  # Last snapshot received (client)
+        self.sync_states = {-1: bytes(STATE.size)}  # tick -> snapshot received, as delta bases (client)
+        self.pending_syncs = {}  # tick -> host state not yet checkable (client)
+        # Stats
+        self.rollbacks = 0
+        self.rollback_ticks = 0
+        self.max_rollback = 0
+        self.stalls = 0
+        self.desyncs = 0
+        self.syncs_checked = 0
+        self.syncs_unchecked = 0
+        self.bytes_sent = 0
+        self.packets_sent = 0
+
+    def can_advance(self):
+        return self.tick - self.confirmed <= MAX_ROLLBACK
+
+    def predict(self, tick):
+        return self.remote.get(tick, self.remote.get(self.confirmed, 0))
+
+    def step(self, tick):
+        local, remote = self.local[tick], self.used[tick]
+        if self.player == 0:
+            simulate(self.game, local, remote)
+        else:
+            simulate(self.game, remote, local)
+
+    def advance(self, local_input):
+        """Simulate the next tick with our input and a predicted remote input."""
+        tick = self.tick
+        self.local[tick] = local_input
+        self.snapshots[tick] = snapshot(self.game)
+        self.used[tick] = self.predict(tick)
+        self.step(tick)
+        self.tick += 1
+        self.send_inputs()
+        self.check_syncs()
+
+    def rollback(self, tick):
+        """Restore the state before tick and simulate forward again with the latest inputs."""
+        depth = self.tick - tick
+        self.rollbacks += 1
+        self.rollback_ticks += depth
+        self.max_rollback = max(self.max_rollback, depth)
+        restore(self.game, self.snapshots[tick])
+        for t in range(tick, self.tick):
+            self.snapshots[t] = snapshot(self.game)
+            self.used[t] = self.predict(t)
+            self.step(t)
+
+    def transmit(self, data):
+        self.bytes_sent += len(data)
+        self.packets_sent += 1
+        self.send(data)
+
+    def send_inputs(self):
+        # Everything the remote has not acknowledged, however old, or it could
+        # wait for a lost input for ever. Stalling at MAX_ROLLBACK keeps the
+        # two peers close, which bounds how many that can be.
+        first = max(min(self.remote_ack + 1, self.tick - REDUNDANCY), 0)
+        inputs = [self.local[t] for t in range(first, self.tick)]
+        self.transmit(INPUT.pack(b'I', first, self.confirmed, self.sync_ack, len(inputs)) +
+                      struct.pack(f'<{len(inputs)}b', *inputs))
+        if self.player == 0:
+            self.send_sync()
+
+    def send_sync(self):
+        # Snapshots of ticks whose inputs are all confirmed, so both peers agree
+        # on them. Until the client acknowledges one it is sent again every
+        # SYNC_RESEND ticks, against whichever base was acknowledged last.
+        tick = (self.confirmed + 1) // SYNC_INTERVAL * SYNC_INTERVAL
+        if tick <= self.sync_base[0]:
+            return
+        if tick in self.sync_sent:
+            if self.tick - self.sync_sent_at < SYNC_RESEND:
+                return
+        elif tick in self.snapshots:
+            self.sync_sent[tick] = self.snapshots[tick]
+        else:
+            return
+        self.sync_sent_at = self.tick
+        state = self.sync_sent[tick]
+        base_tick, base = self.sync_base
+        self.transmit(SYNC.pack(b'S', tick, base_tick) + delta_encode(base, state))
+
+    def receive(self, data):
+        kind = data[:1]
+        if kind == b'I':
+            self.receive_inputs(data)
+        elif kind == b'S':
+            self.receive_sync(data)
+
+    def receive_inputs(self, data):
+        _, first, ack, sync_ack, count = INPUT.unpack_from(data)
+        inputs = struct.unpack_from(f'<{count}b', data, INPUT.size)
+        self.remote_ack = max(self.remote_ack, ack)
+        if sync_ack in self.sync_sent and sync_ack > self.sync_base[0]:
+            self.sync_base = (sync_ack, self.sync_sent[sync_ack])
+            self.sync_sent = {t: s for t, s in self.sync_sent.items() if t > sync_ack}
+
+        wrong = None
+        for tick, value in enumerate(inputs, first):
+            if tick in self.remote or tick <= self.confirmed:
+                continue
+            self.remote[tick] = value
+            if tick < self.tick and self.used[tick] != value and wrong is None:
+                wrong = tick
+        while self.confirmed + 1 in self.remote:
+            self.confirmed += 1
+        if wrong is not None:
+            self.rollback(wrong)
+        self.prune()
+
+    def receive_sync(self, data):
+        _, tick, base_tick = SYNC.unpack_from(data)
+        if base_tick not in self.sync_states or tick <= self.sync_ack:
+            return  # Encoded against a snapshot we no longer hold, or old news
+        state = delta_decode(self.sync_states[base_tick], data[SYNC.size:])
+        # The host only moves its base forward, so older snapshots are done with
+        self.sync_states = {t: s for t, s in self.sync_states.items() if t >= base_tick}
+        self.sync_states[tick] = state
+        self.sync_ack = tick
+        self.pending_syncs[tick] = state
+        self.check_syncs()
+
+    def check_syncs(self):
+        """Compare host snapshots against our own once we have confirmed that tick."""
+        for tick in [t for t in self.pending_syncs if t <= self.confirmed + 1 and t < self.tick]:
+            state = self.pending_syncs.pop(tick)
+            if tick not in self.snapshots:
+                self.syncs_unchecked += 1  # Arrived after our own snapshot was pruned
+                continue
+            self.syncs_checked += 1
+            if self.snapshots[tick] != state:
+                self.desyncs += 1
+                self.snapshots[tick] = state
+                self.rollback(tick)
+
+    def prune(self):
+        # Keep what a rollback, a resend or a sync check could still need
+        if self.player:
+            oldest = min(self.confirmed, self.remote_ack, self.sync_ack) - REDUNDANCY
+        else:
+            # The host also keeps the snapshot it is due to send next
+            oldest = min(min(self.confirmed, self.remote_ack) - REDUNDANCY,
+                         (self.confirmed + 1) // SYNC_INTERVAL * SYNC_INTERVAL)
+        for table in (self.local, self.remote, self.used, self.snapshots):
+            for tick in [t for t in table if t < oldest]:
+                del table[tick]
+
+    def stats(self, seconds):
+        mean = self.rollback_ticks / self.rollbacks if self.rollbacks else 0
+        # Only the client checks snapshots
+        syncs = (f", {self.desyncs} desyncs in {self.syncs_checked} syncs checked, "
+                 f"{self.syncs_unchecked} too late to check" if self.player else "")
+        return (f"player {self.player + 1}: {self.rollbacks} rollbacks (mean {mean:.1f}, max {self.max_rollback} ticks), "
+                f"{self.stalls} stalls{syncs}, "
+                f"{self.bytes_sent / seconds:,.0f} B/s in {self.packets_sent / seconds:.0f} packets/s")
+
+
+# Delays and drops packets to mimic a real network
+class LossyLink:
+    def __init__(self, deliver, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.deliver = deliver
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+
+    def send(self, data):
+        if self.rng.random() < self.loss:
+            return
+        delay = max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0)
+        asyncio.get_running_loop().call_later(delay, self.deliver, data)
+
+
+class Peer(asyncio.DatagramProtocol):
+    def __init__(self, player, address=None, latency=0.0, jitter=0.0, loss=0.0):
+        self.address = address  # The other peer, learnt from its hello when hosting
+        self.link = LossyLink(self.sendto, latency, jitter, loss)
+        self.session = Session(player, self.link.send)
+        self.connected = asyncio.Event()
+        self.last_heard = time.monotonic()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def sendto(self, data):
+        # Packets delayed by the link may come due after the socket closed
+        if self.address is not None and not self.transport.is_closing():
+            self.transport.sendto(data, self.address)
+
+    def datagram_received(self, data, address):
+        self.last_heard = time.monotonic()
+        if data == HELLO:
+            self.address = address
+            # The host answers every hello, since its answer may be lost. The
+            # joining peer never answers, or stray hellos would echo for ever.
+            if self.session.player == 0:
+                self.link.send(HELLO)
+        elif self.address is not None:
+            self.session.receive(data)
+        else:
+            return
+        # Game packets also prove the other side heard us, if its hello got lost
+        self.connected.set()
+
+    async def connect(self):
+        while not self.connected.is_set():
+            self.link.send(HELLO)
+            try:
+                await asyncio.wait_for(self.connected.wait(), HELLO_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def tick_loop(session, ticks, read_input, step=physics.STEP, on_frame=None):
+    """Advance the session at a fixed rate, stalling when too far ahead of the remote."""
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    while session.tick < ticks:
+        if session.can_advance():
+            session.advance(read_input(session))
+        else:
+            session.stalls += 1
+            session.send_inputs()
+        if on_frame is not None and on_frame(session) is False:
+            return
+        next_tick += step
+        await asyncio.sleep(max(next_tick - loop.time(), 0))
+    # Wait for the last remote inputs, then keep resending ours for a while
+    # in case the other side is still missing some
+    while session.confirmed < ticks - 1:
+        session.send_inputs()
+        await asyncio.sleep(step)
+    for _ in range(LINGER):
+        if session.remote_ack >= ticks - 1:
+            break
+        session.send_inputs()
+        await asyncio.sleep(step)
+
+
+def follow_ball(session):
+    """Scripted player for tests: chase the ball in our own (possibly predicted) view.
+
+    Like a person holding a key, it only reconsiders every REACTION_TICKS.
+    """
+    if session.tick % REACTION_TICKS:
+        return session.local.get(session.tick - 1, 0)
+    game = session.game
+    paddle = game.paddle1 if session.player == 0 else game.paddle2
+    offset = game.ball.rect.centery - paddle.rect.centery
+    return (offset > pong.PADDLE_HEIGHT // 4) - (offset < -pong.PADDLE_HEIGHT // 4)
+
+
+async def harness(ticks, latency, jitter, loss, speed, udp, seed=0):
+    """Play two scripted peers against each other in one process and report rollback and bandwidth.
+
+    Returns True if both finished the match in the same state.
+    """
+    step = physics.STEP / speed
+    latency, jitter = latency / speed, jitter / speed
+    if udp:
+        loop = asyncio.get_running_loop()
+        _, host = await loop.create_datagram_endpoint(
+            lambda: Peer(0, None, latency, jitter, loss), local_addr=('127.0.0.1', 0))
+        address = host.transport.get_extra_info('sockname')
+        _, guest = await loop.create_datagram_endpoint(
+            lambda: Peer(1, address, latency, jitter, loss), local_addr=('127.0.0.1', 0))
+        host.link.rng.seed(seed)
+        guest.link.rng.seed(seed + 1)
+        sessions = [host.session, guest.session]
+    else:
+        sessions = []
+        links = [LossyLink(lambda data: sessions[1].receive(data), latency, jitter, loss, seed),
+                 LossyLink(lambda data: sessions[0].receive(data), latency, jitter, loss, seed + 1)]
+        sessions = [Session(0, links[0].send), Session(1, links[1].send)]
+
+    async def match():
+        if udp:
+            await guest.connect()
+            await host.connected.wait()
+        await asyncio.gather(*(tick_loop(session, ticks, follow_ball, step) for session in sessions))
+
+    start = time.perf_counter()
+    # A match that gets stuck connecting or waiting for inputs is reported rather than left hanging
+    timeout = 10 * ticks * step + 10
+    try:
+        await asyncio.wait_for(match(), timeout)
+        finished = True
+    except asyncio.TimeoutError:
+        finished = False
+    elapsed = time.perf_counter() - start
+    seconds = ticks * physics.STEP  # Game time, so bandwidth is per real-speed second
+
+    print(f"{ticks} ticks over {'UDP' if udp else 'an in-process link'} in {elapsed:.1f}s, "
+          f"latency {latency * speed * 1000:.0f} ms, jitter {jitter * speed * 1000:.0f} ms, loss {loss:.0%}")
+    for session in sessions:
+        print(session.stats(seconds))
+    game = sessions[0].game
+    same = finished and snapshot(sessions[0].game) == snapshot(sessions[1].game)
+    if not finished:
+        print(f"STUCK at ticks {sessions[0].tick} and {sessions[1].tick} after {elapsed:.0f}s")
+    else:
+        print(f"final score {game.score1}-{game.score2}, peers {'agree' if same else 'DIVERGED'}")
+    if udp:
+        host.transport.close()
+        guest.transport.close()
+    return same
+
+
+async def play(player, host, port, latency, jitter, loss):
+    loop = asyncio.get_running_loop()
+    if player == 0:
+        _, peer = await loop.create_datagram_endpoint(
+            lambda: Peer(0, None, latency, jitter, loss), local_addr=(host, port))
+        print(f"Waiting for a player on port {port}")
+        await peer.connected.wait()
+    else:
+        _, peer = await loop.create_datagram_endpoint(
+            lambda: Peer(1, (host, port), latency, jitter, loss), local_addr=('0.0.0.0', 0))
+        await peer.connect()
+
+    pygame.init()
+    screen = pygame.display.set_mode((pong.WIDTH, pong.HEIGHT))
+    pygame.display.set_caption(f'Pong (player {player + 1})')
+
+    def read_input(session):
+        keys = pygame.key.get_pressed()
+        return (keys[pygame.K_s] or keys[pygame.K_DOWN]) - (keys[pygame.K_w] or keys[pygame.K_UP])
+
+    def on_frame(session):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        if time.monotonic() - peer.last_heard > TIMEOUT:
+            print(f"Nothing from the other player for {TIMEOUT:.0f}s, ending the match")
+            return False
+        session.game.draw(screen)
+        pygame.display.flip()
+
+    start = time.perf_counter()
+    await tick_loop(peer.session, float('inf'), read_input, on_frame=on_frame)
+    print(peer.session.stats(time.perf_counter() - start))
+    peer.transport.close()
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Two-player Pong over UDP with rollback')
+    parser.add_argument('mode', choices=('host', 'join', 'test'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated one-way delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='simulated delay variation in seconds')
+    parser.add_argument('--loss', type=float, default=0.0, help='simulated share of packets dropped')
+    parser.add_argument('--ticks', type=int, default=1800, help='length of the test match')
+    parser.add_argument('--speed', type=float, default=4.0, help='test speed-up over real time')
+    parser.add_argument('--udp', action='store_true', help='run the test over localhost sockets')
+    parser.add_argument('--all', action='store_true', help='test every network condition in TEST_CASES')
+    args = parser.parse_args()
+
+    if args.mode == 'test':
+        cases = TEST_CASES if args.all else [(args.latency, args.jitter, args.loss)]
+        results = [asyncio.run(harness(args.ticks, latency, jitter, loss, args.speed, args.udp))
+                   for latency, jitter, loss in cases]
+        if not all(results):
+            raise SystemExit(1)
+    else:
+        asyncio.run(play(0 if args.mode == 'host' else 1, args.host, args.port, args.latency, args.jitter, args.loss))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import numpy as np
+
+# SplitMix64 streams for the batched environments. Each environment keeps one
+# uint64 state; adding GOLDEN_GAMMA advances it and mix64 turns the state into
+# an output, so every environment's numbers depend only on its own seed.
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+def mix64(z):
+    """SplitMix64 output function, applied elementwise to a uint64 array."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
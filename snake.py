@@ -1,9 +1,7 @@
 import pygame
-import time
-import random
 
-# Initialize pygame
-pygame.init()
+import textcache
+from snake_engine import SnakeEngine, UP, DOWN, LEFT, RIGHT
 
 # Colors
 white = (255, 255, 255)
@@ -17,107 +15,77 @@ blue = (50, 153, 213)
 width = 600
 height = 400
 
-# Set up display
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption('Snake Game')
-
 # Snake settings
 snake_block = 10
 snake_speed = 15
 
-# Clock
-clock = pygame.time.Clock()
-
 # Font styles
-font_style = pygame.font.SysFont("bahnschrift", 25)
-score_font = pygame.font.SysFont("comicsansms", 35)
+font_style = ("bahnschrift", 25)
+score_font = ("comicsansms", 35)
 
-def our_snake(snake_block, snake_list):
-    for x in snake_list:
-        pygame.draw.rect(screen, black, [x[0], x[1], snake_block, snake_block])
-
-def message(msg, color):
-    mesg = font_style.render(msg, True, color)
-    screen.blit(mesg, [width / 6, height / 3])
+# Game states
+PLAYING, LOST, QUIT = range(3)
 
-def gameLoop():  # Creating a function for the game loop
-    game_over = False
-    game_close = False
+KEY_DIRECTIONS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+}
 
-    x1 = width / 2
-    y1 = height / 2
-
-    x1_change = 0
-    y1_change = 0
-
-    snake_List = []
-    Length_of_snake = 1
-
-    foodx = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-    foody = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
+def our_snake(screen, snake_block, snake_list):
+    for x in snake_list:
+        pygame.draw.rect(screen, black, [x[0] * snake_block, x[1] * snake_block, snake_block, snake_block])
 
-    while not game_over:
+def message(screen, msg, color):
+    mesg = textcache.render(font_style, msg, color)
+    screen.blit(mesg, [width / 6, height / 3])
 
-        while game_close == True:
-            screen.fill(blue)
-            message("You Lost! Press C-Play Again or Q-Quit", red)
-            pygame.display.update()
+def gameLoop():  # One loop drives every state, so restarting never nests calls
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption('Snake Game')
+    clock = pygame.time.Clock()
 
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        game_over = True
-                        game_close = False
-                    if event.key == pygame.K_c:
-                        gameLoop()
+    engine = SnakeEngine(width // snake_block, height // snake_block)
+    state = PLAYING
+    direction = None
 
+    while state != QUIT:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                game_over = True
+                state = QUIT
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    x1_change = -snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_RIGHT:
-                    x1_change = snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_UP:
-                    y1_change = -snake_block
-                    x1_change = 0
-                elif event.key == pygame.K_DOWN:
-                    y1_change = snake_block
-                    x1_change = 0
-
-        if x1 >= width or x1 < 0 or y1 >= height or y1 < 0:
-            game_close = True
-
-        x1 += x1_change
-        y1 += y1_change
-        screen.fill(blue)
-        pygame.draw.rect(screen, green, [foodx, foody, snake_block, snake_block])
-        snake_Head = []
-        snake_Head.append(x1)
-        snake_Head.append(y1)
-        snake_List.append(snake_Head)
-        if len(snake_List) > Length_of_snake:
-            del snake_List[0]
+                if state == PLAYING and event.key in KEY_DIRECTIONS:
+                    direction = KEY_DIRECTIONS[event.key]
+                elif state == LOST:
+                    if event.key == pygame.K_q:
+                        state = QUIT
+                    if event.key == pygame.K_c:
+                        engine.reset()
+                        direction = None
+                        state = PLAYING
 
-        for x in snake_List[:-1]:
-            if x == snake_Head:
-                game_close = True
+        if state == PLAYING:
+            _, dead = engine.step(direction)
+            direction = None
+            if dead:
+                state = LOST
 
-        our_snake(snake_block, snake_List)
+        screen.fill(blue)
+        if state == LOST:
+            message(screen, "You Lost! Press C-Play Again or Q-Quit", red)
+        else:
+            if engine.food is not None:
+                foodx, foody = engine.food % engine.cols, engine.food // engine.cols
+                pygame.draw.rect(screen, green, [foodx * snake_block, foody * snake_block, snake_block, snake_block])
+            our_snake(screen, snake_block, engine.cells())
 
         pygame.display.update()
-
-        if x1 == foodx and y1 == foody:
-            foodx = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-            foody = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-            Length_of_snake += 1
-
+        # The tick also paces the game-over screen instead of spinning
         clock.tick(snake_speed)
 
     pygame.quit()
-    quit()
 
-gameLoop()
\ No newline at end of file
+if __name__ == "__main__":
+    gameLoop()
@@ -0,0 +1,297 @@
+import argparse
+import time
+from collections import deque
+
+from snake_engine import SnakeEngine
+
+# Snake autopilot. It plans a shortest path to the food that takes the
+# moving tail into account, and only takes it if the snake could still reach
+# its tail after eating. On grids with a Hamiltonian cycle that means the body
+# must end up in cycle order with room to spare, since the head can then
+# always follow the cycle round to its tail. When no such path exists it
+# follows the cycle, cutting corners only where that keeps the body in order,
+# and looks for a safe food path again every row or so. A food path is
+# followed until it runs out or its next cell is blocked, instead of
+# replanning every tick. Grids with an odd number of both rows and columns
+# have no Hamiltonian cycle, so there the cycle leaves out one corner, which
+# the snake takes as a detour when the food is in it. Such a snake grows to
+# the length of the cycle, but only fills the last cell when the food happens
+# to spawn right where it is needed.
+
+
+def hamiltonian_cycle(cols, rows):
+    """Return next[cell] along a cycle through every cell, or None if none exists.
+
+    Zigzags over columns 1.. row by row and comes back up column 0, which
+    needs an even number of rows (or columns, using the transposed walk).
+    """
+    if rows % 2 and cols % 2:
+        return None
+    transpose = rows % 2 == 1
+    if transpose:
+        cols, rows = rows, cols
+    order = [(0, y) for y in range(rows - 1, -1, -1)]
+    for y in range(rows):
+        xs = range(1, cols) if y % 2 == 0 else range(cols - 1, 0, -1)
+        order.extend((x, y) for x in xs)
+    if transpose:
+        cols, rows = rows, cols
+        order = [(y, x) for x, y in order]
+    cells = [y * cols + x for x, y in order]
+    cycle = [0] * (cols * rows)
+    for i, cell in enumerate(cells):
+        cycle[cell] = cells[(i + 1) % len(cells)]
+    return cycle
+
+
+def corner_cycle(cols, rows):
+    """Return next[cell] along a cycle through every cell but the bottom-left corner.
+
+    For grids with an odd number of both rows and columns, where no cycle can
+    cover every cell. Rows above the last two zigzag as in hamiltonian_cycle,
+    the last two rows are walked column by column back to column 0, and the
+    corner's own entry leads back onto the cycle, so the two cycle cells next
+    to it can be joined through it instead of through the cell between them.
+    """
+    order = [(0, y) for y in range(rows - 2, -1, -1)]
+    for y in range(rows - 2):
+        xs = range(1, cols) if y % 2 == 0 else range(cols - 1, 0, -1)
+        order.extend((x, y) for x in xs)
+    for i, x in enumerate(range(cols - 1, 0, -1)):
+        ys = (rows - 2, rows - 1) if i % 2 == 0 else (rows - 1, rows - 2)
+        order.extend((x, y) for y in ys)
+    cells = [y * cols + x for x, y in order]
+    cycle = [0] * (cols * rows)
+    for i, cell in enumerate(cells):
+        cycle[cell] = cells[(i + 1) % len(cells)]
+    cycle[(rows - 1) * cols] = (rows - 2) * cols
+    return cycle
+
+
+class Autopilot:
+    def __init__(self, engine):
+        self.engine = engine
+        cols, rows = engine.cols, engine.rows
+        # Neighbour lists for every cell, built once
+        self.neighbours = []
+        for cell in range(cols * rows):
+            x, y = cell % cols, cell // cols
+            cells = []
+            if x > 0:
+                cells.append(cell - 1)
+            if x < cols - 1:
+                cells.append(cell + 1)
+            if y > 0:
+                cells.append(cell - cols)
+            if y < rows - 1:
+                cells.append(cell + cols)
+            self.neighbours.append(cells)
+        self.cycle = hamiltonian_cycle(cols, rows)
+        if self.cycle is None and cols > 1 and rows > 1:
+            self.cycle = corner_cycle(cols, rows)
+        if self.cycle is not None:
+            # Index of every cell along the cycle. A corner left out of it
+            # shares the index of the cell it can stand in for.
+            self.position = [-1] * (cols * rows)
+            cell, self.size = 0, 0
+            while self.position[cell] < 0:
+                self.position[cell] = self.size
+                self.size += 1
+                cell = self.cycle[cell]
+            self.corner = self.position.index(-1) if self.size < cols * rows else None
+            if self.corner is not None:
+                self.position[self.corner] = (self.position[self.cycle[self.corner]] - 1) % self.size
+        self.path = deque()
+        self.food = None
+        self.plans = 0
+        self.wait = 0
+
+    def search(self, body, growth, target=None):
+        """Shortest path from the head to target, or to the tail if target is None.
+
+        A body segment i places from the tail is gone after i + 1 + growth
+        steps, so the head may pass through it from then on. Entering any
+        segment after it has gone counts as reaching the tail, since the
+        head can then follow the rest of the body around for ever.
+        """
+        head = body[-1]
+        free_at = {cell: i + 1 + growth for i, cell in enumerate(body)}
+        previous = {head: None}
+        frontier = [head]
+        steps = 0
+        while frontier:
+            steps += 1
+            next_frontier = []
+            for cell in frontier:
+                for n in self.neighbours[cell]:
+                    if n in previous or free_at.get(n, 0) > steps:
+                        continue
+                    previous[n] = cell
+                    if n == target or (target is None and n in free_at):
+                        path = deque()
+                        while n != head:
+                            path.appendleft(n)
+                            n = previous[n]
+                        return path
+                    next_frontier.append(n)
+            frontier = next_frontier
+        return None
+
+    def after(self, path, ate):
+        """Return (body, growth) once path has been followed, ate saying if it ends at the food."""
+        engine = self.engine
+        length = engine.length + ate
+        body = (list(engine.body) + list(path))[-(length - ate):]
+        return body, length - len(body)
+
+    def in_cycle_order(self, body, growth):
+        """Check the head can follow the cycle round to the tail without running into it.
+
+        The body must lie along the cycle in order from the tail, with the
+        free cells ahead of the head covering the growth still to come.
+        Food that appears in a gap the body skips can only be eaten once the
+        tail has passed it, and food appearing just ahead time after time
+        would close the distance to the tail first. So gaps are only left
+        while the snake is short enough that half the board stays ahead.
+        """
+        size = self.size
+        base = self.position[body[0]]
+        previous = -1
+        for cell in body:
+            offset = (self.position[cell] - base) % size
+            if offset <= previous:
+                return False
+            previous = offset
+        gaps = previous + 1 - len(body)
+        ahead = size - 1 - previous
+        return ahead - growth - gaps > size // 2
+
+    def safe_after(self, path, ate):
+        """Check the head can still reach the tail once it has followed path."""
+        body, growth = self.after(path, ate)
+        if ate and len(body) == len(self.neighbours):
+            return True  # Eating the last food fills the board and ends the game
+        if self.cycle is not None:
+            return self.in_cycle_order(body, growth)
+        return len(body) < 2 or self.search(body, growth) is not None
+
+    def food_path(self):
+        """Return a path to the food after which the tail is still reachable, or None."""
+        self.plans += 1
+        engine = self.engine
+        if engine.food is None:
+            return None
+        path = self.search(engine.body, engine.length - len(engine.body), engine.food)
+        if path is not None and self.safe_after(path, True):
+            return path
+        return None
+
+    def decide(self):
+        """Return the direction for the next step."""
+        engine = self.engine
+        head = engine.head
+        if engine.food != self.food:
+            self.food = engine.food
+            self.path = self.food_path() or deque()
+        elif self.path and not self.enterable(self.path[0]):
+            self.path = self.food_path() or deque()
+        elif not self.path:
+            # Look for a safe path again about once per row while following
+            # the cycle, or every tick while chasing the tail
+            self.wait -= 1
+            if self.wait <= 0 or self.cycle is None:
+                self.wait = engine.cols
+                self.path = self.food_path() or deque()
+        if self.path:
+            cell = self.path.popleft()
+        else:
+            cell = self.fallback(head)
+        return self.direction(head, cell)
+
+    def enterable(self, cell):
+        # The tail cell is free next step unless the snake is still growing
+        engine = self.engine
+        return not engine.occupied[cell] or (cell == engine.body[0] and len(engine.body) >= engine.length)
+
+    def fallback(self, head):
+        """Take one step along the cycle, or towards the tail if there is none.
+
+        Of the moves that keep the body in cycle order, takes the one that
+        gets furthest along the cycle without passing the food. Food in a
+        corner the cycle leaves out is taken in place of the cell it stands
+        in for.
+        """
+        engine = self.engine
+        if self.cycle is not None:
+            ahead = self.cycle[head]
+            corner = self.corner
+            if corner is not None and corner in self.neighbours[head] and self.position[corner] == self.position[ahead]:
+                # Both continue the cycle. Eat from whichever holds the food
+                # while the snake still fits in the cycle, and avoid the food
+                # once it no longer does.
+                if (engine.food == corner) == (engine.length < self.size):
+                    ahead = corner
+            size = self.size
+            food = self.position[engine.food] if engine.food is not None else self.position[head]
+
+            def distance(cell):
+                # Landing beside the food on the cell sharing its index passes it
+                return (food - self.position[cell]) % size or (0 if cell == engine.food else size)
+
+            best, best_distance = None, distance(ahead)
+            for cell in self.neighbours[head]:
+                if (distance(cell) < best_distance and self.enterable(cell)
+                        and self.safe_after([cell], cell == engine.food)):
+                    best, best_distance = cell, distance(cell)
+            if best is None and self.enterable(ahead):
+                best = ahead
+            if best is not None:
+                return best
+        if len(engine.body) > 1:
+            path = self.search(engine.body, engine.length - len(engine.body))
+            # Eating on the way delays the tail, so it has to be checked
+            if path is not None and (path[0] != engine.food or self.safe_after([path[0]], True)):
+                return path[0]
+        cells = [cell for cell in self.neighbours[head] if self.enterable(cell)]
+        for cell in cells:
+            if self.safe_after([cell], cell == engine.food):
+                return cell
+        return cells[0] if cells else self.neighbours[head][0]
+
+    def direction(self, head, cell):
+        cols = self.engine.cols
+        return (cell % cols - head % cols, cell // cols - head // cols)
+
+
+def run(size, steps, seed=0):
+    engine = SnakeEngine(size, size, seed)
+    pilot = Autopilot(engine)
+    decision_time = 0.0
+    games = 1
+    start = time.perf_counter()
+    for _ in range(steps):
+        t = time.perf_counter()
+        direction = pilot.decide()
+        decision_time += time.perf_counter() - t
+        _, dead = engine.step(direction)
+        if dead:
+            engine.reset(seed + games)
+            pilot = Autopilot(engine)
+            games += 1
+    elapsed = time.perf_counter() - start
+    print(f"{size}x{size}: {steps / elapsed:,.0f} steps/s, "
+          f"mean decision {decision_time / steps * 1e6:.1f} us, {pilot.plans} plans, "
+          f"length {engine.length}, {games - 1} deaths")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the snake autopilot headless')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 60, 200])
+    parser.add_argument('--steps', type=int, default=20000)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.steps)
+
+
+if __name__ == "__main__":
+    main()
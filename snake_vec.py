@@ -0,0 +1,137 @@
+import argparse
+import time
+
+import numpy as np
+
+from rng import GOLDEN_GAMMA, mix64
+from snake_engine import COLS, ROWS, DIRECTIONS
+
+# Many Snake games stepped together for reinforcement learning. Every piece
+# of state is an array over environments: head cell, body ring buffer,
+# occupancy grid and food. step() moves all of them with array operations,
+# following the same rules as gameLoop / SnakeEngine.
+
+DX = np.array([dx for dx, _ in DIRECTIONS])
+DY = np.array([dy for _, dy in DIRECTIONS])
+
+# Rewards
+FOOD_REWARD = 1.0
+DEATH_REWARD = -1.0
+
+
+class VecSnake:
+    def __init__(self, num_envs, cols=COLS, rows=ROWS, seed=0):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.env = np.arange(num_envs)
+        self.occupied = np.zeros((num_envs, self.cells), dtype=bool)
+        self.ring = np.zeros((num_envs, self.cells), dtype=np.int32)  # Body cells, head at head_pos
+        self.head_pos = np.zeros(num_envs, dtype=np.int64)
+        self.body_len = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.head = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+        self.rng_state = np.zeros(num_envs, dtype=np.uint64)
+        self.reset(seed + np.arange(num_envs, dtype=np.uint64))
+
+    def reset(self, seeds, envs=None):
+        """Reset the listed environments (all by default), each with its own seed."""
+        envs = self.env if envs is None else np.asarray(envs, dtype=np.int64)
+        self.rng_state[envs] = mix64(np.asarray(seeds, dtype=np.uint64))
+        start = (self.rows // 2) * self.cols + self.cols // 2
+        self.occupied[envs] = False
+        self.occupied[envs, start] = True
+        self.ring[envs, 0] = start
+        self.head_pos[envs] = 0
+        self.body_len[envs] = 1
+        self.length[envs] = 1
+        self.head[envs] = start
+        self.spawn_food(envs)
+
+    def random(self, envs):
+        self.rng_state[envs] += GOLDEN_GAMMA
+        return mix64(self.rng_state[envs])
+
+    def spawn_food(self, envs):
+        """Put food on a uniformly chosen free cell of each listed environment."""
+        if not len(envs):
+            return
+        free = ~self.occupied[envs]
+        counts = free.sum(axis=1)
+        u = (self.random(envs) >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+        target = (u * counts).astype(np.int64)
+        self.food[envs] = np.argmax(np.cumsum(free, axis=1) > target[:, None], axis=1)
+        # A full board has nowhere to put food
+        self.food[envs[counts == 0]] = -1
+
+    def step(self, actions):
+        """Move every snake one cell in the direction given by its action.
+
+        Actions index snake_engine.DIRECTIONS. Returns (rewards, dones);
+        environments that finished are reset automatically.
+        """
+        actions = np.asarray(actions)
+        env = self.env
+        x = self.head % self.cols + DX[actions]
+        y = self.head // self.cols + DY[actions]
+        dead = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        cell = np.where(dead, 0, y * self.cols + x)
+
+        # Like gameLoop, the tail moves out of the way before the collision check
+        release = (self.body_len >= self.length) & ~dead
+        tail = self.ring[env, (self.head_pos - self.body_len + 1) % self.cells]
+        self.occupied[env[release], tail[release]] = False
+        self.body_len -= release
+
+        dead |= self.occupied[env, cell]
+        alive = ~dead
+        moved = env[alive]
+        self.head_pos[moved] = (self.head_pos[moved] + 1) % self.cells
+        self.ring[moved, self.head_pos[moved]] = cell[moved]
+        self.occupied[moved, cell[moved]] = True
+        self.body_len[moved] += 1
+        self.head[moved] = cell[moved]
+
+        ate = alive & (cell == self.food)
+        self.length += ate
+        self.spawn_food(env[ate])
+
+        rewards = np.where(dead, DEATH_REWARD, np.where(ate, FOOD_REWARD, 0.0))
+        if dead.any():
+            # Continue each finished environment's own random stream into its
+            # next game; the others' streams are untouched
+            dead_envs = env[dead]
+            self.reset(self.random(dead_envs), dead_envs)
+        return rewards, dead
+
+    def grids(self):
+        """Observation grids: 1 for body, 2 for head, 3 for food."""
+        grids = self.occupied.astype(np.int8)
+        grids[self.env, self.head] = 2
+        has_food = self.food >= 0
+        grids[self.env[has_food], self.food[has_food]] = 3
+        return grids.reshape(self.num_envs, self.rows, self.cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized snake environment')
+    parser.add_argument('--envs', type=int, default=4096)
+    parser.add_argument('--steps', type=int, default=1000)
+    args = parser.parse_args()
+
+    envs = VecSnake(args.envs)
+    actions = np.random.default_rng(0).integers(0, 4, (args.steps, args.envs))
+    start = time.perf_counter()
+    deaths = 0
+    for step_actions in actions:
+        _, dones = envs.step(step_actions)
+        deaths += dones.sum()
+    elapsed = time.perf_counter() - start
+    print(f"{args.envs} envs x {args.steps} steps in {elapsed:.2f}s = "
+          f"{args.envs * args.steps / elapsed:,.0f} env steps/s ({deaths} episodes ended)")
+
+
+if __name__ == "__main__":
+    main()
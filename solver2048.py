@@ -0,0 +1,223 @@
+import argparse
+import importlib
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from packed2048 import DIRECTIONS, GRID_SIZE, PackedGame, empty_cells, from_grid, move, unpack_row, transpose
+
+# Expectimax solver for 2048 on packed boards (see packed2048.py)
+
+# Heuristic weights, scored per row and summed over rows and columns
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+# Chance nodes for spawns, matching add_tile's random.choice([2, 4])
+SPAWNS = ((1, 0.5), (2, 0.5))
+MIN_PROBABILITY = 0.0001
+MAX_DEPTH = 8
+TIME_BUDGET = 0.1
+
+
+def row_heuristic(row):
+    cells = unpack_row(row)
+    total = sum(value ** SUM_POWER for value in cells)
+    empty = cells.count(0)
+    merges = 0
+    previous = 0
+    counter = 0
+    for value in cells:
+        if not value:
+            continue
+        if value == previous:
+            counter += 1
+        elif counter > 0:
+            merges += 1 + counter
+            counter = 0
+        previous = value
+    if counter > 0:
+        merges += 1 + counter
+    monotonicity_left = 0
+    monotonicity_right = 0
+    for c in range(1, GRID_SIZE):
+        if cells[c - 1] > cells[c]:
+            monotonicity_left += cells[c - 1] ** MONOTONICITY_POWER - cells[c] ** MONOTONICITY_POWER
+        else:
+            monotonicity_right += cells[c] ** MONOTONICITY_POWER - cells[c - 1] ** MONOTONICITY_POWER
+    return (LOST_PENALTY + EMPTY_WEIGHT * empty + MERGES_WEIGHT * merges
+            - MONOTONICITY_WEIGHT * min(monotonicity_left, monotonicity_right) - SUM_WEIGHT * total)
+
+
+# Heuristic for every possible row, built once at import
+ROW_HEURISTIC = [row_heuristic(row) for row in range(65536)]
+
+
+def heuristic(board):
+    columns = transpose(board)
+    return (ROW_HEURISTIC[board & 0xFFFF] + ROW_HEURISTIC[(board >> 16) & 0xFFFF]
+            + ROW_HEURISTIC[(board >> 32) & 0xFFFF] + ROW_HEURISTIC[board >> 48]
+            + ROW_HEURISTIC[columns & 0xFFFF] + ROW_HEURISTIC[(columns >> 16) & 0xFFFF]
+            + ROW_HEURISTIC[(columns >> 32) & 0xFFFF] + ROW_HEURISTIC[columns >> 48])
+
+
+class OutOfTime(Exception):
+    pass
+
+
+# Depth-limited expectimax from a single position
+class Search:
+    def __init__(self, min_probability=MIN_PROBABILITY, deadline=None):
+        self.min_probability = min_probability
+        self.deadline = deadline
+        self.table = {}  # board -> (depth, value)
+        self.nodes = 0
+
+    def chance(self, board, depth, probability):
+        # Nodes that are too deep or too unlikely are scored statically
+        if depth <= 0 or probability < self.min_probability:
+            return heuristic(board)
+        entry = self.table.get(board)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+        empty = empty_cells(board)
+        if not empty:
+            return self.max_node(board, depth, probability)
+        probability /= len(empty)
+        total = 0.0
+        for i in empty:
+            for exponent, p in SPAWNS:
+                total += p * self.max_node(board | (exponent << (4 * i)), depth, probability * p)
+        value = total / len(empty)
+        self.table[board] = (depth, value)
+        return value
+
+    def max_node(self, board, depth, probability):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 255 == 0 and time.monotonic() > self.deadline:
+            raise OutOfTime
+        best = 0.0  # No legal move: the game is lost
+        for direction in DIRECTIONS:
+            new_board, _, changed = move(board, direction)
+            if changed:
+                best = max(best, self.chance(new_board, depth - 1, probability))
+        return best
+
+
+def score_move(board, direction, depth, deadline=None):
+    """Expected value of a root move, or None if it is illegal or time ran out."""
+    new_board, _, changed = move(board, direction)
+    if not changed:
+        return None
+    try:
+        return Search(deadline=deadline).chance(new_board, depth, 1.0)
+    except OutOfTime:
+        return None
+
+
+def best_move(board, depth):
+    """Pick a move with a fixed-depth search in this process."""
+    best = None
+    best_value = None
+    for direction in DIRECTIONS:
+        value = score_move(board, direction, depth)
+        if value is not None and (best_value is None or value > best_value):
+            best, best_value = direction, value
+    return best
+
+
+def timed_move(board, pool, budget=TIME_BUDGET, max_depth=MAX_DEPTH):
+    """Pick a move by iterative deepening within a time budget.
+
+    The four root moves are scored in parallel on the pool. The result of
+    the deepest search that finished in time is used. Returns None if no
+    move changes the board.
+    """
+    deadline = time.monotonic() + budget
+    legal = [d for d in DIRECTIONS if move(board, d)[2]]
+    if not legal:
+        return None
+    best = legal[0]
+    for depth in range(1, max_depth + 1):
+        values = pool.starmap(score_move, [(board, d, depth, deadline) for d in legal])
+        if None in values:
+            break
+        best = legal[values.index(max(values))]
+        if time.monotonic() > deadline:
+            break
+    return best
+
+
+def play_game(seed, depth=2):
+    """Play one headless game. Returns (highest tile, score, moves)."""
+    game = PackedGame(seed)
+    moves = 0
+    while True:
+        direction = best_move(game.board, depth)
+        if direction is None:
+            break
+        game.move(direction)
+        moves += 1
+    highest = max(max(row) for row in game.grid)
+    return highest, game.score, moves
+
+
+def batch(games, depth, workers):
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        results = pool.starmap(play_game, [(seed, depth) for seed in range(games)])
+    elapsed = time.perf_counter() - start
+    tiles = Counter(highest for highest, _, _ in results)
+    moves = sum(m for _, _, m in results)
+    print(f"{games} games at depth {depth} in {elapsed:.1f}s ({moves / elapsed:,.0f} moves/s)")
+    for tile in sorted(tiles):
+        reached = sum(count for t, count in tiles.items() if t >= tile)
+        print(f"{tile:6d}: {tiles[tile]:5d} games ended here, {reached / games:6.1%} reached it")
+
+
+def play_ui(budget, workers):
+    # Start the workers before pygame is initialized; forking after that hangs
+    with Pool(workers) as pool:
+        game_module = importlib.import_module('2048')
+        pygame = game_module.pygame
+        pygame.init()
+        clock = pygame.time.Clock()
+        screen = pygame.display.set_mode((game_module.WIDTH, game_module.HEIGHT))
+        pygame.display.set_caption('2048 Solver')
+        game = game_module.Game()
+
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    return
+
+            direction = timed_move(from_grid(game.grid), pool, budget)
+            if direction is not None:
+                game.move(direction)
+
+            game.draw(screen)
+            pygame.display.flip()
+            clock.tick(game_module.FPS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Expectimax solver for 2048')
+    parser.add_argument('--games', type=int, help='play this many headless games and report the highest tiles')
+    parser.add_argument('--depth', type=int, default=2, help='search depth for --games')
+    parser.add_argument('--budget', type=float, default=TIME_BUDGET, help='seconds per move in the UI')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.games:
+        batch(args.games, args.depth, args.workers)
+    else:
+        play_ui(args.budget, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from batch2048 import BatchGame, DIRECTIONS, from_left, slide_left, to_left
+
+# 2048.py can't be imported with a plain import statement
+game_module = importlib.import_module('2048')
+
+
+@pytest.mark.parametrize('direction', range(4))
+def test_moves_match_game(direction):
+    rng = np.random.default_rng(0)
+    cells = rng.choice(np.array([0, 0, 1, 2, 3, 4, 5, 6], dtype=np.int16), size=(2000, 4, 4))
+    moved, _ = slide_left(np.ascontiguousarray(to_left(cells.copy(), direction)))
+    moved = from_left(moved, direction)
+    game = game_module.Game()
+    game.add_tile = lambda: None  # Compare the moves only, not the spawns
+    for board, expected in zip(cells, moved):
+        game.grid = [[1 << int(v) if v else 0 for v in row] for row in board]
+        game.move(DIRECTIONS[direction])
+        assert [[int(v).bit_length() - 1 if v else 0 for v in row] for row in game.grid] == expected.tolist()
+
+
+def test_large_exponents_do_not_wrap():
+    game = BatchGame(1, 12)
+    game.boards[:] = 0
+    game.boards[0, 0, :2] = 127
+    game.add_tiles = lambda mask: None
+    game.move([0])
+    assert game.boards[0, 0, 0] == 128
+
+
+def test_grid_too_large():
+    with pytest.raises(ValueError):
+        BatchGame(1, 200)
@@ -0,0 +1,34 @@
+import random
+
+import numpy as np
+import pygame
+
+import physics
+from breakout import BALL_SIZE, BRICK_HEIGHT, BRICK_TOP
+from breakout_multiball import MultiBallGame, sweep
+
+
+def test_sweep_matches_physics():
+    rng = random.Random(0)
+    for _ in range(2000):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        dx, dy = rng.choice([0, rng.uniform(-30, 30)]), rng.choice([0, rng.uniform(-30, 30)])
+        rect = pygame.Rect(rng.randint(20, 80), rng.randint(20, 80), rng.randint(1, 75), rng.randint(1, 20))
+        expected = physics.sweep(x, y, BALL_SIZE, BALL_SIZE, dx, dy, rect)
+        t, nx, ny = sweep(np.array([x]), np.array([y]), BALL_SIZE, BALL_SIZE, np.array([dx]), np.array([dy]),
+                          rect.left, rect.top, rect.right, rect.bottom)
+        if expected is None:
+            assert t[0] == np.inf
+        else:
+            assert (t[0], nx[0], ny[0]) == expected
+
+
+def test_fast_ball_does_not_tunnel():
+    game = MultiBallGame(rows=1, max_balls=1)
+    # Faster than a brick is tall, so checking only where the ball lands would miss the brick
+    game.x, game.y = np.array([100.0]), np.array([BRICK_TOP + BRICK_HEIGHT + 5.0])
+    game.dx, game.dy = np.array([0.0]), np.array([-2.0 * (BRICK_HEIGHT + BALL_SIZE)])
+    game.update()
+    assert game.score == 1
+    # It bounced off the brick and spent the rest of the step moving back down
+    assert game.y[0] > BRICK_TOP + BRICK_HEIGHT and game.dy[0] > 0
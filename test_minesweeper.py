@@ -0,0 +1,36 @@
+import numpy as np
+
+from minesweeper import Minesweeper
+from minesweeper_gen import find_board
+
+
+def test_zero_mines():
+    game = Minesweeper(5, 6, 0, seed=0)
+    assert not game.mines.any()
+    assert not game.counts.any()
+    game.reveal_tile(2, 3)
+    assert game.revealed.all()
+
+
+def test_empty_mine_list():
+    game = Minesweeper(5, 6, 0, mines=[])
+    assert not game.mines.any()
+    game.reveal_tile(0, 0)
+    assert game.revealed.all()
+
+
+def test_given_mines_and_counts():
+    game = Minesweeper(3, 3, 2, mines=[0, 8])
+    assert game.mines.tolist() == [[True, False, False], [False, False, False], [False, False, True]]
+    assert game.counts.tolist() == [[0, 1, 0], [1, 2, 1], [0, 1, 0]]
+
+
+def test_placed_mine_count():
+    game = Minesweeper(10, 10, 30, seed=1)
+    assert int(game.mines.sum()) == 30
+    assert np.array_equal(game.mines, Minesweeper(10, 10, 30, seed=1).mines)
+
+
+def test_zero_mine_board_is_no_guess():
+    mines, attempts = find_board((4, 4, 0, 0, 1))
+    assert mines == [] and attempts == 1
@@ -0,0 +1,61 @@
+import copy
+import importlib
+import random
+
+import pytest
+
+import packed2048
+from packed2048 import DIRECTIONS, move, random_board, to_grid, from_grid
+
+# 2048.py can't be imported with a plain import statement
+game_module = importlib.import_module('2048')
+
+
+def test_grid_round_trip():
+    grid = [[0, 2, 4, 8], [16, 32, 64, 128], [256, 512, 1024, 2048], [4096, 8192, 16384, 32768]]
+    assert to_grid(from_grid(grid)) == grid
+
+
+@pytest.mark.parametrize('direction', DIRECTIONS)
+def test_moves_match_game(direction):
+    rng = random.Random(0)
+    game = game_module.Game()
+    game.add_tile = lambda: None  # Compare the moves only, not the spawns
+    for _ in range(5000):
+        board = random_board(rng)
+        before = to_grid(board)
+        game.grid = copy.deepcopy(before)
+        game.move(direction)
+        new_board, _, changed = move(board, direction)
+        assert to_grid(new_board) == game.grid, before
+        assert changed == (game.grid != before), before
+
+
+def test_score():
+    board = from_grid([[2, 2, 4, 4], [8, 0, 8, 0], [2, 4, 8, 16], [0, 0, 0, 0]])
+    new_board, score, changed = move(board, 'left')
+    assert to_grid(new_board) == [[4, 8, 0, 0], [16, 0, 0, 0], [2, 4, 8, 16], [0, 0, 0, 0]]
+    assert score == 4 + 8 + 16
+    assert changed
+
+
+def test_unchanged_move():
+    board = from_grid([[2, 4, 8, 16], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+    assert move(board, 'left') == (board, 0, False)
+
+
+def test_packed_game_spawns_after_move():
+    game = packed2048.PackedGame(seed=1)
+    assert len(packed2048.empty_cells(game.board)) == 14
+    game.board = from_grid([[2, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+    score, changed = game.move('left')
+    assert (score, changed) == (4, True)
+    assert len(packed2048.empty_cells(game.board)) == 14
+
+
+def test_largest_tiles_do_not_merge():
+    # A nibble cannot hold 65536, so unlike Game the packed board keeps two 32768s
+    board = from_grid([[32768, 32768, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+    assert move(board, 'left') == (board, 0, False)
+    new_board, score, _ = move(board, 'right')
+    assert to_grid(new_board)[0] == [0, 0, 32768, 32768] and score == 0
@@ -0,0 +1,51 @@
+import pong
+from pong import BALL_SIZE, Game, fold, HEIGHT
+
+
+def test_fold():
+    assert fold(50, 0, 100) == 50
+    assert fold(130, 0, 100) == 70
+    assert fold(-30, 0, 100) == 30
+    assert fold(250, 0, 100) == 50
+
+
+def test_wall_bounce_keeps_prediction():
+    game = Game(ai1='easy', ai2='easy', seed=0)
+    ai = game.ai2
+    game.ball.dy = -abs(game.ball.dy)  # Heading for the top wall, towards ai2
+    ai.update()
+    target, predictions = ai.target, ai.predictions
+    while game.ball.dy < 0:
+        game.update()
+    assert game.ball.dx > 0
+    assert (ai.target, ai.predictions) == (target, predictions)
+    # It still reacts to a bounce off the paddle
+    game.ball.dx = -game.ball.dx
+    ai.update()
+    assert ai.predictions == predictions + 1
+
+
+def test_prediction_matches_flight():
+    game = Game(ai1=None, ai2='hard', seed=1)
+    ai = game.ai2
+    ai.error = 0
+    ai.update()
+    ai.target = ai.predict()
+    while game.ball.x < ai.contact_x:
+        pong.physics.move(game.ball, game.obstacles)
+    assert abs(game.ball.y + game.ball.h / 2 - ai.target) < 1e-6
+    assert 0 <= ai.target <= HEIGHT
+
+
+def test_paddle_edge_bounce_predicts_again():
+    game = Game(ai1=None, ai2='easy', seed=0)
+    ai = game.ai2
+    paddle = game.paddle2.rect
+    # Falling onto the paddle's top edge while still moving towards it
+    game.ball.teleport(paddle.left - 2, paddle.top - BALL_SIZE - 2)
+    game.ball.dx, game.ball.dy = 1, 5
+    ai.update()
+    predictions = ai.predictions
+    game.update()
+    assert game.ball.dx > 0 and game.ball.dy < 0
+    assert ai.predictions == predictions + 1
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+import pong_net
+from pong_net import Session, delta_decode, delta_encode, snapshot
+
+
+def test_delta_round_trip():
+    game = Session(0, lambda data: None).game
+    base = snapshot(game)
+    game.update()
+    state = snapshot(game)
+    assert delta_decode(base, delta_encode(base, state)) == state
+
+
+def test_peers_agree_at_half_loss():
+    # Used to stall for good once a lost input fell out of the resend window
+    assert asyncio.run(pong_net.harness(600, 0.05, 0.02, 0.5, 20, False))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_udp_peers_connect_and_agree_at_half_loss(seed):
+    # Seeds 1 and 3 used to lose the one hello reply and never connect
+    assert asyncio.run(pong_net.harness(200, 0, 0, 0.5, 8, True, seed))
+
+
+def test_desync_is_repaired(monkeypatch):
+    advance = Session.advance
+
+    def corrupt(self, local_input):
+        advance(self, local_input)
+        if self.player == 1 and self.tick == 200:
+            self.game.paddle1.rect.y += 37
+
+    monkeypatch.setattr(Session, 'advance', corrupt)
+    assert asyncio.run(pong_net.harness(600, 0.05, 0.02, 0.3, 20, False))
+
+
+def test_sync_for_pruned_tick_is_not_checked():
+    session = Session(1, lambda data: None)
+    for _ in range(5):
+        session.advance(0)
+    session.confirmed = session.tick - 1
+    del session.snapshots[2]
+    session.pending_syncs[2] = bytes(pong_net.STATE.size)
+    session.check_syncs()
+    assert (session.syncs_checked, session.syncs_unchecked, session.desyncs) == (0, 1, 0)
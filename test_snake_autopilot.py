@@ -0,0 +1,52 @@
+import pytest
+
+from snake_engine import SnakeEngine
+from snake_autopilot import Autopilot, corner_cycle, hamiltonian_cycle
+
+
+@pytest.mark.parametrize('cols, rows', [(4, 4), (6, 5), (5, 6), (10, 10)])
+def test_cycle_visits_every_cell(cols, rows):
+    cycle = hamiltonian_cycle(cols, rows)
+    cell, seen = 0, set()
+    for _ in range(cols * rows):
+        x, y, cell = cell % cols, cell // cols, cycle[cell]
+        assert abs(cell % cols - x) + abs(cell // cols - y) == 1
+        seen.add(cell)
+    assert len(seen) == cols * rows and cell == 0
+
+
+def test_no_cycle_on_odd_grid():
+    assert hamiltonian_cycle(5, 7) is None
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_fills_the_board(seed):
+    engine = SnakeEngine(10, 10, seed)
+    pilot = Autopilot(engine)
+    while engine.food is not None:
+        _, dead = engine.step(pilot.decide())
+        assert not dead, engine.length
+    assert len(engine.body) == 100
+
+
+@pytest.mark.parametrize('size', [3, 7])
+def test_corner_cycle_visits_every_other_cell(size):
+    cycle = corner_cycle(size, size)
+    corner = (size - 1) * size
+    cell, seen = 0, set()
+    for _ in range(size * size - 1):
+        x, y, cell = cell % size, cell // size, cycle[cell]
+        assert abs(cell % size - x) + abs(cell // size - y) == 1
+        seen.add(cell)
+    assert corner not in seen and len(seen) == size * size - 1 and cell == 0
+    # The cells on either side of the corner are two apart on the cycle
+    assert cycle[cycle[corner + 1]] == cycle[corner]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_grows_to_the_cycle_on_odd_grid(seed):
+    engine = SnakeEngine(7, 7, seed)
+    pilot = Autopilot(engine)
+    while engine.food is not None and engine.length < 48:
+        _, dead = engine.step(pilot.decide())
+        assert not dead, engine.length
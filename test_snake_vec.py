@@ -0,0 +1,38 @@
+import numpy as np
+
+from snake_vec import VecSnake
+
+
+def run(envs, actions):
+    foods = []
+    for step_actions in actions:
+        envs.step(step_actions)
+        foods.append(envs.food.copy())
+    return np.array(foods)
+
+
+def test_envs_keep_their_own_streams():
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, (3000, 4))
+    other = actions.copy()
+    other[:, 1] = rng.integers(0, 4, 3000)
+    # Env 1 dies at different times, which must not change env 0's food
+    a = run(VecSnake(4, 10, 10), actions)
+    b = run(VecSnake(4, 10, 10), other)
+    assert np.array_equal(a[:, 0], b[:, 0])
+    assert not np.array_equal(a[:, 1], b[:, 1])
+
+
+def test_batch_matches_single_env():
+    actions = np.random.default_rng(1).integers(0, 4, (3000, 3))
+    batch = run(VecSnake(3, 10, 10, seed=5), actions)
+    single = run(VecSnake(1, 10, 10, seed=7), actions[:, 2:])
+    assert np.array_equal(batch[:, 2], single[:, 0])
+
+
+def test_wall_death_resets():
+    envs = VecSnake(2, 4, 4)
+    for _ in range(2):
+        rewards, dones = envs.step([1, 0])  # Down, up from row 2
+    assert dones.tolist() == [True, False]
+    assert envs.length[0] == 1 and envs.head[0] == 2 * 4 + 2
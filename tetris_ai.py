@@ -0,0 +1,216 @@
+import argparse
+import time
+from collections import OrderedDict
+
+from tetris_core import Tetris, ROWS, COLS, FULL_ROW, SHAPES, SHAPE_MASKS, SHAPE_WIDTHS, fits
+
+# Weights from the well known hand-tuned "El-Tetris style" evaluation
+HEIGHT_WEIGHT = -0.510066
+LINES_WEIGHT = 0.760666
+HOLES_WEIGHT = -0.35663
+BUMPINESS_WEIGHT = -0.184483
+GAME_OVER_SCORE = -1e9
+SPAWN_COL = COLS // 2 - 1
+
+# Rotations that give a distinct piece (O has one, I/S/Z have two), built once
+DISTINCT_ROTATIONS = []
+for masks in SHAPE_MASKS:
+    rotations = []
+    for rotation, rotation_masks in enumerate(masks):
+        if rotation_masks not in [masks[r] for r in rotations]:
+            rotations.append(rotation)
+    DISTINCT_ROTATIONS.append(rotations)
+
+
+def board_features(board):
+    """Return (column heights, holes) for a bitboard."""
+    heights = [0] * COLS
+    seen = 0
+    holes = 0
+    for r, row in enumerate(board):
+        new = row & ~seen
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = ROWS - r
+            new ^= low
+        seen |= row
+        holes += (seen & ~row).bit_count()
+    return heights, holes
+
+
+def default_heuristic(board):
+    heights, holes = board_features(board)
+    bumpiness = sum(abs(heights[c] - heights[c + 1]) for c in range(COLS - 1))
+    return HEIGHT_WEIGHT * sum(heights) + HOLES_WEIGHT * holes + BUMPINESS_WEIGHT * bumpiness
+
+
+def place(board, masks, row, col):
+    """Merge a piece into a board tuple and clear lines. Returns (board, lines)."""
+    board = list(board)
+    for mask in masks:
+        board[row] |= mask << col
+        row += 1
+    kept = [r for r in board if r != FULL_ROW]
+    cleared = ROWS - len(kept)
+    return (0,) * cleared + tuple(kept), cleared
+
+
+def placements(board, index):
+    """Yield (rotation, row, col) for every final placement of a piece.
+
+    A placement is reachable if the piece can be rotated at the spawn
+    position, slid along the top row to the column and dropped straight down.
+    """
+    masks = SHAPE_MASKS[index]
+    widths = SHAPE_WIDTHS[index]
+    for rotation in range(4):
+        if not fits(board, masks[rotation], widths[rotation], 0, SPAWN_COL):
+            break
+        if rotation not in DISTINCT_ROTATIONS[index]:
+            continue
+        rotation_masks = masks[rotation]
+        width = widths[rotation]
+        cols = [SPAWN_COL]
+        col = SPAWN_COL - 1
+        while fits(board, rotation_masks, width, 0, col):
+            cols.append(col)
+            col -= 1
+        col = SPAWN_COL + 1
+        while fits(board, rotation_masks, width, 0, col):
+            cols.append(col)
+            col += 1
+        for col in cols:
+            row = 0
+            while fits(board, rotation_masks, width, row + 1, col):
+                row += 1
+            yield rotation, row, col
+
+
+# Bounded LRU transposition table for board values
+class LRUCache:
+    def __init__(self, size):
+        self.size = size
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        if len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+
+# Placement-search autoplayer
+class TetrisAI:
+    def __init__(self, heuristic=default_heuristic, depth=2, cache_size=200000, lines_weight=LINES_WEIGHT):
+        self.heuristic = heuristic
+        self.depth = depth
+        self.lines_weight = lines_weight
+        self.cache = LRUCache(cache_size)
+        self.placements = 0
+
+    def value(self, board, depth):
+        """Score a board, looking ahead over every possible next piece."""
+        key = (board, depth)
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        if depth == 0:
+            value = self.heuristic(board)
+        else:
+            total = 0
+            for index in range(len(SHAPES)):
+                total += self.best(board, index, depth)[0]
+            value = total / len(SHAPES)
+        self.cache.put(key, value)
+        return value
+
+    def best(self, board, index, depth):
+        """Return (score, rotation, row, col) of the best placement of a piece."""
+        best = (GAME_OVER_SCORE, 0, 0, SPAWN_COL)
+        masks = SHAPE_MASKS[index]
+        for rotation, row, col in placements(board, index):
+            self.placements += 1
+            new_board, lines = place(board, masks[rotation], row, col)
+            score = self.lines_weight * lines + self.value(new_board, depth - 1)
+            if score > best[0]:
+                best = (score, rotation, row, col)
+        return best
+
+    def choose(self, game):
+        """Pick a placement for the current piece of a Tetris game."""
+        return self.best(tuple(game.board), game.current_index, self.depth)[1:]
+
+    def play_move(self, game):
+        """Place the current piece of a Tetris game and spawn the next one."""
+        rotation, row, col = self.choose(game)
+        game.current_rotation = rotation
+        game.current_position = [row, col]
+        game.drop_shape()
+
+
+def benchmark(moves, depth, seed):
+    game = Tetris(seed)
+    ai = TetrisAI(depth=depth)
+    start = time.perf_counter()
+    played = 0
+    while played < moves and not game.game_over:
+        ai.play_move(game)
+        played += 1
+    elapsed = time.perf_counter() - start
+    lookups = ai.cache.hits + ai.cache.misses
+    print(f"depth {depth}: {played} moves, score {game.score}, "
+          f"{ai.placements} placements in {elapsed:.2f}s = {ai.placements / elapsed:,.0f} placements/s, "
+          f"cache hit rate {ai.cache.hits / max(lookups, 1):.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tetris placement-search autoplayer')
+    parser.add_argument('--bench', action='store_true', help='run headless and report placements per second')
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--moves', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.bench:
+        for depth in range(1, args.depth + 1):
+            benchmark(args.moves, depth, args.seed)
+        return
+
+    # Only the watch mode needs a window
+    import pygame
+    import tetris
+
+    pygame.init()
+    screen = pygame.display.set_mode((tetris.WIDTH, tetris.HEIGHT))
+    pygame.display.set_caption('Tetris AI')
+    clock = pygame.time.Clock()
+    game = Tetris(args.seed)
+    ai = TetrisAI(depth=args.depth)
+    while not game.game_over:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+        ai.play_move(game)
+        screen.fill(tetris.BLACK)
+        tetris.draw_board(screen, game)
+        tetris.draw_current_shape(screen, game)
+        pygame.display.flip()
+        clock.tick(10)
+
+    print("Game Over! AI score:", game.score)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
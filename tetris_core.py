@@ -0,0 +1,210 @@
+import argparse
+import random
+import time
+from multiprocessing import Pool
+
+# Pure game logic for Tetris. Nothing here imports pygame, so games can be
+# simulated headless (bots, worker processes); tetris.py is the frontend.
+
+# Constants
+ROWS, COLS = 20, 10
+
+# Shapes
+SHAPES = [
+    [[[1, 1, 1, 1]]],  # I
+    [[[1, 1, 1], [0, 1, 0]]],  # T
+    [[[1, 1, 0], [0, 1, 1]]],  # Z
+    [[[0, 1, 1], [1, 1, 0]]],  # S
+    [[[1, 1], [1, 1]]],  # O
+    [[[1, 0, 0], [1, 1, 1]]],  # L
+    [[[0, 0, 1], [1, 1, 1]]],  # J
+]
+
+# Actions accepted by Tetris.step
+NOOP, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP = range(6)
+ACTIONS = (NOOP, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP)
+
+# Rotation tables, built once at import. SHAPE_ROTATIONS[i][rot] is the cell
+# matrix of shape i turned clockwise rot times, and SHAPE_MASKS[i][rot] is the
+# same piece as one bitmask per row (bit c set for column c).
+def rotate(shape):
+    return tuple(tuple(row) for row in zip(*shape[::-1]))
+
+def build_rotations(shape):
+    rotations = [tuple(tuple(row) for row in shape)]
+    for _ in range(3):
+        rotations.append(rotate(rotations[-1]))
+    return rotations
+
+def row_masks(shape):
+    return tuple(sum(1 << c for c, value in enumerate(row) if value) for row in shape)
+
+SHAPE_ROTATIONS = [build_rotations(shape[0]) for shape in SHAPES]
+SHAPE_MASKS = [[row_masks(rot) for rot in rots] for rots in SHAPE_ROTATIONS]
+SHAPE_WIDTHS = [[len(rot[0]) for rot in rots] for rots in SHAPE_ROTATIONS]
+SHAPE_CELLS = [[[(r, c) for r, row in enumerate(rot) for c, value in enumerate(row) if value]
+                for rot in rots] for rots in SHAPE_ROTATIONS]
+FULL_ROW = (1 << COLS) - 1
+
+def fits(board, masks, width, row, col):
+    """Return True if a piece with the given row masks fits at (row, col)."""
+    if row < 0 or col < 0 or col + width > COLS or row + len(masks) > ROWS:
+        return False
+    for mask in masks:
+        if board[row] & (mask << col):
+            return False
+        row += 1
+    return True
+
+# Class for the Tetris game
+class Tetris:
+    def __init__(self, seed=None):
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.rng = random.Random(seed)
+        # One int per row for collisions; cells hold shape index + 1 for drawing
+        self.board = [0] * ROWS
+        self.cells = [[0] * COLS for _ in range(ROWS)]
+        self.game_over = False
+        self.current_index = self.new_shape()
+        self.current_rotation = 0
+        self.current_position = [0, COLS // 2 - 1]
+        self.score = 0
+
+    @property
+    def current_shape(self):
+        return SHAPE_ROTATIONS[self.current_index][self.current_rotation]
+
+    def new_shape(self):
+        return self.rng.randint(0, len(SHAPES) - 1)
+
+    def rotate_shape(self):
+        rotation = (self.current_rotation + 1) % 4
+        # Only keep the rotation if the rotated piece fits
+        if self.valid_move((0, 0), rotation):
+            self.current_rotation = rotation
+
+    def valid_move(self, offset, rotation=None):
+        if rotation is None:
+            rotation = self.current_rotation
+        return fits(self.board, SHAPE_MASKS[self.current_index][rotation],
+                    SHAPE_WIDTHS[self.current_index][rotation],
+                    self.current_position[0] + offset[0], self.current_position[1] + offset[1])
+
+    def merge_shape(self):
+        row, col = self.current_position
+        for r, mask in enumerate(SHAPE_MASKS[self.current_index][self.current_rotation]):
+            self.board[row + r] |= mask << col
+        for r, c in SHAPE_CELLS[self.current_index][self.current_rotation]:
+            self.cells[row + r][col + c] = self.current_index + 1
+
+    def clear_lines(self):
+        kept = [r for r in range(ROWS) if self.board[r] != FULL_ROW]
+        cleared = ROWS - len(kept)
+        if cleared:
+            self.board = [0] * cleared + [self.board[r] for r in kept]
+            self.cells = [[0] * COLS for _ in range(cleared)] + [self.cells[r] for r in kept]
+            self.score += 100 * cleared
+
+    def drop_shape(self):
+        """Move the piece down one row, locking it in place if it can't move."""
+        if self.valid_move((1, 0)):
+            self.current_position[0] += 1
+            return False
+        self.merge_shape()
+        self.clear_lines()
+        self.current_index = self.new_shape()
+        self.current_rotation = 0
+        self.current_position = [0, COLS // 2 - 1]
+        if not self.valid_move((0, 0)):
+            self.game_over = True
+        return True
+
+    def apply(self, action):
+        """Apply a player action without advancing gravity."""
+        if action == LEFT:
+            if self.valid_move((0, -1)):
+                self.current_position[1] -= 1
+        elif action == RIGHT:
+            if self.valid_move((0, 1)):
+                self.current_position[1] += 1
+        elif action == ROTATE:
+            self.rotate_shape()
+        elif action == DOWN:
+            self.drop_shape()
+        elif action == HARD_DROP:
+            while not self.drop_shape():
+                pass
+
+    def step(self, action):
+        """Apply an action followed by one gravity tick.
+
+        Returns (points scored this step, game over).
+        """
+        if self.game_over:
+            return 0, True
+        score = self.score
+        self.apply(action)
+        if not self.game_over and action != HARD_DROP:
+            self.drop_shape()
+        return self.score - score, self.game_over
+
+    def snapshot(self):
+        """Return a picklable copy of the full game state."""
+        return {
+            'board': tuple(self.board),
+            'cells': tuple(tuple(row) for row in self.cells),
+            'current_index': self.current_index,
+            'current_rotation': self.current_rotation,
+            'current_position': tuple(self.current_position),
+            'score': self.score,
+            'game_over': self.game_over,
+            'rng': self.rng.getstate(),
+        }
+
+    def restore(self, snapshot):
+        self.board = list(snapshot['board'])
+        self.cells = [list(row) for row in snapshot['cells']]
+        self.current_index = snapshot['current_index']
+        self.current_rotation = snapshot['current_rotation']
+        self.current_position = list(snapshot['current_position'])
+        self.score = snapshot['score']
+        self.game_over = snapshot['game_over']
+        self.rng.setstate(snapshot['rng'])
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        game = cls()
+        game.restore(snapshot)
+        return game
+
+
+def play_random(seed, max_steps=10000):
+    """Play one game with uniformly random actions. Returns (score, steps)."""
+    game = Tetris(seed)
+    policy = random.Random(seed)
+    steps = 0
+    while not game.game_over and steps < max_steps:
+        game.step(policy.choice(ACTIONS))
+        steps += 1
+    return game.score, steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run seeded headless Tetris games')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        results = pool.map(play_random, range(args.games), chunksize=64)
+    elapsed = time.perf_counter() - start
+    steps = sum(s for _, s in results)
+    print(f"{args.games} games, {steps} steps in {elapsed:.2f}s = "
+          f"{args.games / elapsed:,.0f} games/s, {steps / elapsed:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
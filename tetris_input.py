@@ -0,0 +1,97 @@
+from tetris_core import LEFT, RIGHT, DOWN
+
+# Timings in milliseconds
+DAS = 167  # Delay before a held key starts repeating
+ARR = 33  # Delay between repeats once it does
+GRAVITY_INTERVAL = 1000
+
+REPEATING = (LEFT, RIGHT, DOWN)
+OPPOSITE = {LEFT: RIGHT, RIGHT: LEFT}
+
+
+# Turns timestamped key presses and releases into timestamped actions,
+# including delayed auto-shift and auto-repeat for held keys.
+class InputHandler:
+    def __init__(self, das=DAS, arr=ARR):
+        if arr <= 0:
+            raise ValueError("arr must be positive")
+        self.das = das
+        self.arr = arr
+        self.queue = []
+        self.held = {}  # action -> time of its next repeat
+
+    def press(self, action, t):
+        self.queue.append((t, action))
+        if action in REPEATING:
+            # The most recently pressed direction wins
+            self.held.pop(OPPOSITE.get(action), None)
+            self.held[action] = t + self.das
+
+    def release(self, action, t):
+        self.held.pop(action, None)
+
+    def poll(self, now):
+        """Return every (time, action) up to now, in time order.
+
+        Repeats are generated at their exact due time rather than once per
+        frame, so a late frame never loses repeats.
+        """
+        events = self.queue
+        self.queue = []
+        for action, next_time in self.held.items():
+            while next_time <= now:
+                events.append((next_time, action))
+                next_time += self.arr
+            self.held[action] = next_time
+        events.sort()
+        return events
+
+
+# Advances a game on its own clock, independent of how often it is drawn.
+# Input and gravity are interleaved by timestamp.
+class Simulation:
+    def __init__(self, game, handler, gravity_interval=GRAVITY_INTERVAL):
+        self.game = game
+        self.handler = handler
+        self.gravity_interval = gravity_interval
+        self.time = 0
+        self.next_gravity = gravity_interval
+
+    def advance(self, now):
+        """Run the simulation up to time now.
+
+        Returns the timestamps of the inputs that were applied.
+        """
+        applied = []
+        for t, action in self.handler.poll(now):
+            self.gravity_until(t)
+            if self.game.game_over:
+                return applied
+            self.game.apply(action)
+            applied.append(t)
+        self.gravity_until(now)
+        self.time = now
+        return applied
+
+    def gravity_until(self, t):
+        while self.next_gravity <= t and not self.game.game_over:
+            self.game.drop_shape()
+            self.next_gravity += self.gravity_interval
+
+
+# Keeps input-to-display latency samples
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = []
+
+    def record(self, input_times, shown_at):
+        for t in input_times:
+            self.samples.append(shown_at - t)
+
+    def summary(self):
+        if not self.samples:
+            return "no inputs recorded"
+        samples = sorted(self.samples)
+        mean = sum(samples) / len(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return f"{len(samples)} inputs, mean {mean:.1f} ms, p95 {p95:.1f} ms, max {samples[-1]:.1f} ms"
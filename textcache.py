@@ -0,0 +1,60 @@
+import pygame
+from collections import OrderedDict
+
+# Shared text rendering for all the games. Fonts are loaded once and rendered
+# surfaces are kept in an LRU cache keyed on (font, text, colour), so text
+# that doesn't change between frames is only rasterized once.
+
+MAX_SURFACES = 512
+
+
+class TextCache:
+    def __init__(self, max_surfaces=MAX_SURFACES):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, font):
+        """Return the pygame font for a (name, size) pair, loading it once."""
+        loaded = self.fonts.get(font)
+        if loaded is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            loaded = self.fonts[font] = pygame.font.SysFont(*font)
+        return loaded
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = self.font(font).render(text, antialias, color)
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'fonts': len(self.fonts), 'surfaces': len(self.surfaces)}
+
+
+# Shared instance used by the games
+_cache = TextCache()
+
+
+def get_font(font):
+    return _cache.font(font)
+
+
+def render(font, text, color, antialias=True):
+    """Render text with a (name, size) font, reusing a cached surface if possible."""
+    return _cache.render(font, text, color, antialias)
+
+
+def stats():
+    """Return the shared cache's hit and miss counts."""
+    return _cache.stats()